@@ -1,18 +1,27 @@
 import sqlite3
-from typing import Optional
+from typing import Optional, Tuple, Any, Iterable, Mapping, Union
 
 class DatabaseConnection:
     """A context manager for handling SQLite database connections."""
     
-    def __init__(self, db_name: str):
-        """Initialize with the database name."""
+    def __init__(self, db_name: str,
+                 pragmas: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]] = ()):
+        """Initialize with the database name and PRAGMA settings applied on connect.
+
+        pragmas is a dict or (name, value) pairs, e.g. a tuning profile such
+        as python-decorators-0x01's sqlite_profiles.PROFILES['read-heavy'].
+        """
         self.db_name = db_name
+        self.pragmas: Tuple[Tuple[str, Any], ...] = tuple(
+            pragmas.items() if isinstance(pragmas, Mapping) else pragmas)
         self.conn: Optional[sqlite3.Connection] = None
         self.cursor: Optional[sqlite3.Cursor] = None
     
     def __enter__(self):
         """Open the database connection and return the cursor."""
         self.conn = sqlite3.connect(self.db_name)
+        for name, value in self.pragmas:
+            self.conn.execute(f"PRAGMA {name} = {value}")
         self.cursor = self.conn.cursor()
         return self.cursor
     
@@ -2,20 +2,60 @@
 import sqlite3
 import functools
 import logging
+import random
+import sys
+import time
 from datetime import datetime
+from query_stats import fingerprint, query_stats
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def log_queries(func=None, *, sample_rate=1.0, stats=query_stats):
+    """Log each query and record its timing, row count and caller.
+
+    The SQL is only formatted when INFO is enabled; a DEBUG record with
+    structured fields (fingerprint, elapsed_ms, rows, caller) follows each
+    timed call. Only a sample_rate fraction of calls is timed into stats.
+    With logging above INFO and stats.enabled False the wrapper just
+    forwards the call.
+    """
+    if func is None:
+        return lambda f: log_queries(f, sample_rate=sample_rate, stats=stats)
+
+    is_enabled_for = logger.isEnabledFor
+    sample = random.random if sample_rate < 1.0 else None
 
-def log_queries(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Get the query from the first argument
+        log = is_enabled_for(logging.INFO)
+        timed = stats.enabled and (sample is None or sample() < sample_rate)
+        if not (log or timed):
+            return func(*args, **kwargs)
+
+        # Get the query from the first argument (or the query keyword when
+        # the first argument is something else, e.g. a connection)
         query = args[0] if args else kwargs.get('query', '')
-        # Log the query with timestamp
-        logging.info(f"Executing query: {query}")
-        # Execute the original function
+        if not isinstance(query, str):
+            query = kwargs.get('query', query)
+        if log:
+            logger.info("Executing query: %s", query)
+        # Only SQL text can be fingerprinted
+        if not (timed and isinstance(query, str)):
+            return func(*args, **kwargs)
+
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
+        elapsed = time.perf_counter_ns() - start
+        rows = len(result) if isinstance(result, (list, tuple)) else None
+        frame = sys._getframe(1)
+        caller = f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        stats.record(query, elapsed, rows, caller)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Query finished in %.3f ms, %s rows", elapsed / 1e6, rows, extra={
+                'fingerprint': fingerprint(query), 'elapsed_ms': elapsed / 1e6, 'rows': rows, 'caller': caller,
+            })
         return result
     return wrapper
 
@@ -34,3 +74,4 @@ if __name__ == "__main__":
     users = fetch_all_users(query="SELECT * FROM users")
     for user in users:
         print(user)
+    query_stats.export(n=5)
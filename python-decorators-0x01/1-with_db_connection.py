@@ -1,21 +1,19 @@
 
 import sqlite3
 import functools
+from db_pool import get_pool
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Open database connection
-        conn = sqlite3.connect('users.db')
-        try:
+        # Borrow a pooled connection; it is returned to the pool (with any
+        # uncommitted work rolled back) even if the function raises
+        with get_pool('users.db').connection() as conn:
             # Call the function with the connection as the first argument
             result = func(conn, *args, **kwargs)
             # Commit any changes
             conn.commit()
             return result
-        finally:
-            # Always close the connection
-            conn.close()
     return wrapper
 
 @with_db_connection
@@ -1,33 +1,94 @@
 
 import sqlite3
 import functools
+from db_pool import get_pool
+from group_commit import get_writer
+from result_cache import invalidate_tables, tables_written
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
-        try:
-            result = func(conn, *args, **kwargs)
-            return result
-        finally:
-            conn.close()
+        # Called from inside another decorated function: reuse its connection
+        if args and isinstance(args[0], sqlite3.Connection):
+            return func(*args, **kwargs)
+        with get_pool('users.db').connection() as conn:
+            return func(conn, *args, **kwargs)
     return wrapper
 
-def transactional(func):
+# Nesting depth of transactional calls per connection (id(conn) -> depth)
+_depth = {}
+
+def transactional(func=None, *, group_commit=None):
+    """Run func(conn, ...) in a transaction, committing on success and rolling back on error.
+
+    Calls nest: inside another transactional call on the same connection
+    (or any transaction already open on it) func runs in a SAVEPOINT
+    that is released on success and rolled back to on error, and only the
+    outermost call commits.
+
+    With group_commit (a GroupCommitWriter, e.g. get_writer('users.db'))
+    the decorated function is called without a connection: the call is
+    queued on the writer's connection, committed together with concurrent
+    writes, and a Future for its result is returned.
+    """
+    if func is None:
+        return lambda f: transactional(f, group_commit=group_commit)
+
+    if group_commit is not None:
+        @functools.wraps(func)
+        def submit(*args, **kwargs):
+            return group_commit.submit(func, *args, **kwargs)
+        return submit
+
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
+        depth = _depth.get(id(conn), 0)
+        if depth or conn.in_transaction:
+            return _nested(func, conn, depth, *args, **kwargs)
+        _depth[id(conn)] = 1
+        # Record the tables written in this transaction for cache invalidation
+        written = set()
+        conn.set_trace_callback(lambda statement: written.update(tables_written(statement)))
         try:
+            # Begin explicitly so nested savepoints do not commit on RELEASE
+            conn.execute("BEGIN")
             # Execute the function within a transaction
             result = func(conn, *args, **kwargs)
             # Commit the transaction if no errors
             conn.commit()
-            return result
         except Exception as e:
             # Rollback the transaction on error
             conn.rollback()
             raise e  # Re-raise the exception for caller to handle
+        finally:
+            conn.set_trace_callback(None)
+            del _depth[id(conn)]
+        # Evict cached query results that read the tables just changed
+        if written:
+            invalidate_tables(written)
+        return result
     return wrapper
 
+def _nested(func, conn, depth, *args, **kwargs):
+    """Run func inside a savepoint of the transaction already open on conn."""
+    savepoint = f"transactional_{depth}"
+    _depth[id(conn)] = depth + 1
+    conn.execute(f"SAVEPOINT {savepoint}")
+    try:
+        result = func(conn, *args, **kwargs)
+    except Exception:
+        conn.execute(f"ROLLBACK TO {savepoint}")
+        conn.execute(f"RELEASE {savepoint}")
+        raise
+    else:
+        conn.execute(f"RELEASE {savepoint}")
+        return result
+    finally:
+        if depth:
+            _depth[id(conn)] = depth
+        else:
+            del _depth[id(conn)]
+
 @with_db_connection
 @transactional
 def update_user_email(conn, user_id, new_email):
@@ -35,6 +96,20 @@ def update_user_email(conn, user_id, new_email):
     cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
     return cursor.rowcount
 
+@with_db_connection
+@transactional
+def rename_user(conn, user_id, new_name, new_email):
+    # Composes update_user_email: same connection, one commit for both
+    conn.execute("UPDATE users SET name = ? WHERE id = ?", (new_name, user_id))
+    return update_user_email(conn, user_id, new_email)
+
+# High-rate variant: returns a Future, committed in groups with concurrent updates
+@transactional(group_commit=get_writer('users.db'))
+def queue_user_email_update(conn, user_id, new_email):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+    return cursor.rowcount
+
 # Example: Create a sample database and table for testing
 def setup_database():
     conn = sqlite3.connect('users.db')
@@ -68,5 +143,13 @@ if __name__ == "__main__":
         updated_email = cursor.fetchone()[0]
         print(f"New email for user 1: {updated_email}")
         conn.close()
+
+        # Nested transactional calls share one connection and one commit
+        rename_user(1, 'Alice Cartwright', 'alice.cartwright@example.com')
+        print("Renamed user 1 in one transaction")
+
+        # Queue several updates; they are committed together
+        futures = [queue_user_email_update(2, f'bob{i}@example.com') for i in range(10)]
+        print(f"Group-committed {sum(future.result() for future in futures)} update(s)")
     except Exception as e:
         print(f"Error updating email: {e}")
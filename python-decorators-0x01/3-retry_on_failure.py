@@ -2,39 +2,151 @@
 import time
 import sqlite3
 import functools
+from db_pool import get_pool
+from retry_policy import (CircuitOpenError, RetryBudgetExhausted, RetryStats, backoff, breaker_metrics,
+                          get_breaker, is_lock_error, is_retryable, retry_budget)
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
-        try:
-            result = func(conn, *args, **kwargs)
-            return result
-        finally:
-            conn.close()
+        with get_pool('users.db').connection() as conn:
+            return func(conn, *args, **kwargs)
     return wrapper
 
-def retry_on_failure(retries=3, delay=2):
+def _busy_timeout(conn):
+    """The connection's busy_timeout in ms."""
+    return conn.execute("PRAGMA busy_timeout").fetchone()[0]
+
+def _set_busy_timeout(conn, seconds):
+    """Set the connection's busy_timeout and return the previous one (in ms)."""
+    previous = _busy_timeout(conn)
+    conn.execute(f"PRAGMA busy_timeout = {max(0, int(seconds * 1000))}")
+    return previous
+
+def retry_on_failure(retries=3, delay=2, max_delay=30.0, deadline=None, retryable=is_retryable,
+                     busy_wait=True, breaker=None, budget=retry_budget, sleep=time.sleep,
+                     clock=time.monotonic):
+    """Retry retryable SQLite errors up to retries attempts in total.
+
+    Waits grow exponentially from delay with full jitter (capped at
+    max_delay), so contenders spread out instead of colliding again.
+    deadline bounds the total time in seconds across all attempts. Errors
+    that retryable() rejects are raised at once.
+
+    When the first argument is a sqlite3.Connection and busy_wait is set,
+    lock errors are not slept on: the backoff window becomes SQLite's
+    busy_timeout for the next attempt, so the lock is taken as soon as it
+    is released. The connection's own busy_timeout is restored afterwards.
+    SQLite skips the busy handler when waiting cannot help (deadlocks, a
+    stale WAL snapshot); a lock error that came back without waiting is
+    therefore backed off like any other error.
+
+    A transaction opened by a failed attempt is rolled back before the next
+    one. When the connection was already in a transaction on entry, that
+    transaction belongs to the caller: it is left alone and lock errors are
+    slept on, since no busy_timeout can make a retry inside it succeed.
+
+    Every retry is taken from budget, the process-wide RetryBudget by
+    default; once it is spent errors surface as RetryBudgetExhausted
+    instead of adding load. With a CircuitBreaker (see get_breaker) calls
+    fail fast with CircuitOpenError while the database keeps failing.
+    Both are sqlite3.OperationalError subclasses.
+
+    Attempt counts are kept in wrapper.retry_stats.
+    """
     def decorator(func):
+        stats = RetryStats()
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            attempts = 0
-            last_error = None
-            while attempts < retries:
-                try:
-                    return func(*args, **kwargs)
-                except sqlite3.OperationalError as e:
-                    attempts += 1
-                    last_error = e
-                    if attempts == retries:
-                        raise last_error
-                    time.sleep(delay)
-            raise last_error  # In case retries are exhausted without an exception
+            conn = args[0] if args and isinstance(args[0], sqlite3.Connection) else None
+            owns_transaction = conn is not None and not conn.in_transaction
+            use_busy_wait = busy_wait and owns_transaction
+            busy_window = None  # busy_timeout in seconds of the current attempt
+            expires = clock() + deadline if deadline is not None else None
+            previous_timeout = None
+            attempt = 0
+            if budget is not None:
+                budget.record_call()
+            try:
+                while True:
+                    attempt += 1
+                    if breaker is not None:
+                        try:
+                            breaker.allow()
+                        except CircuitOpenError:
+                            stats.record_call(attempt - 1, False, circuit_open=True)
+                            raise
+                    started = clock()
+                    try:
+                        result = func(*args, **kwargs)
+                    except sqlite3.Error as e:
+                        elapsed = clock() - started
+                        retry = retryable(e)
+                        if breaker is not None:
+                            # Only availability problems count against the database
+                            if retry:
+                                breaker.record_failure()
+                            else:
+                                breaker.record_success()
+                        if not retry or attempt >= retries:
+                            stats.record_call(attempt, False)
+                            raise
+                        remaining = expires - clock() if expires is not None else max_delay
+                        if remaining <= 0:
+                            stats.record_call(attempt, False, deadline_exceeded=True)
+                            raise
+                        if budget is not None and not budget.try_spend():
+                            stats.record_call(attempt, False, budget_exhausted=True)
+                            raise RetryBudgetExhausted(f"Retry budget exhausted: {e}") from e
+                        if owns_transaction and conn.in_transaction:
+                            # Start over: the failed attempt's writes and snapshot are void
+                            conn.rollback()
+                        lock_wait = use_busy_wait and is_lock_error(e)
+                        if lock_wait:
+                            if busy_window is None:
+                                busy_window = _busy_timeout(conn) / 1000
+                            # An error well inside the window means the busy handler never ran
+                            lock_wait = elapsed >= busy_window / 2
+                        if lock_wait:
+                            # SQLite's busy handler returns as soon as the lock is free,
+                            # so it can be given the whole backoff window
+                            wait = min(max_delay, delay * (2 ** (attempt - 1)), remaining)
+                            timeout = _set_busy_timeout(conn, wait)
+                            busy_window = wait
+                            if previous_timeout is None:
+                                previous_timeout = timeout
+                            stats.record_retry(e, 0.0)
+                        else:
+                            wait = min(backoff(attempt - 1, delay, max_delay), remaining)
+                            sleep(wait)
+                            stats.record_retry(e, wait)
+                        continue
+                    except Exception:
+                        # The database answered; the failure is the caller's
+                        if breaker is not None:
+                            breaker.record_success()
+                        stats.record_call(attempt, False)
+                        raise
+                    except BaseException:
+                        # Interrupted: no outcome, so a half-open trial slot is handed back
+                        if breaker is not None:
+                            breaker.release()
+                        raise
+                    if breaker is not None:
+                        breaker.record_success()
+                    stats.record_call(attempt, True)
+                    return result
+            finally:
+                if previous_timeout is not None:
+                    conn.execute(f"PRAGMA busy_timeout = {previous_timeout}")
+
+        wrapper.retry_stats = stats
         return wrapper
     return decorator
 
 @with_db_connection
-@retry_on_failure(retries=3, delay=1)
+@retry_on_failure(retries=3, delay=1, breaker=get_breaker('users.db'))
 def fetch_users_with_retry(conn):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM users")
@@ -69,3 +181,6 @@ if __name__ == "__main__":
             print(user)
     except sqlite3.OperationalError as e:
         print(f"Failed to fetch users after retries: {e}")
+    print(f"Retry stats: {fetch_users_with_retry.retry_stats.as_dict()}")
+    print(f"Retry budget: {retry_budget.as_dict()}")
+    print(f"Circuit breakers: {breaker_metrics()}")
@@ -1,34 +1,55 @@
+import os
 import time
 import sqlite3
 import functools
+from db_pool import get_pool
+from result_cache import MISS, SingleFlight, cache_from_url, make_key, tables_read
 
-query_cache = {}
+# Results are kept for 5 minutes. By default they live in a bounded in-process
+# LRU (256 results / 16 MiB); set QUERY_CACHE_URL to share them between worker
+# processes, e.g. sqlite:///query_cache.db or redis://127.0.0.1:6379
+query_cache = cache_from_url(os.environ.get('QUERY_CACHE_URL', 'memory://'),
+                             max_entries=256, max_bytes=16 * 1024 * 1024, ttl=300)
+# Concurrent misses for the same key share one execution
+in_flight = SingleFlight()
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
-        try:
-            result = func(conn, *args, **kwargs)
-            return result
-        finally:
-            conn.close()
+        with get_pool('users.db').connection() as conn:
+            return func(conn, *args, **kwargs)
     return wrapper
 
-def cache_query(func):
+def cache_query(func=None, *, wait_timeout=30.0):
+    # Usable as @cache_query or @cache_query(wait_timeout=...)
+    if func is None:
+        return functools.partial(cache_query, wait_timeout=wait_timeout)
+
     @functools.wraps(func)
     def wrapper(conn, query, *args, **kwargs):
-        # Use the query string as the cache key
-        cache_key = query
+        # Key on the normalized query plus its parameters
+        cache_key = make_key(query, args, kwargs)
         # Check if the result is in the cache
-        if cache_key in query_cache:
+        result = query_cache.get(cache_key)
+        if result is not MISS:
             print(f"Cache hit for query: {query}")
-            return query_cache[cache_key]
-        # If not in cache, execute the function and store the result
+            return result
         print(f"Cache miss for query: {query}")
-        result = func(conn, query, *args, **kwargs)
-        query_cache[cache_key] = result
-        return result
+
+        def load():
+            # A previous leader may have filled the cache since our lookup;
+            # this re-check is not counted as a second miss
+            cached = query_cache.get(cache_key, record=False)
+            if cached is not MISS:
+                return cached
+            # Execute the function and store the result, tagged with the
+            # tables it read so writes can invalidate it
+            loaded = func(conn, query, *args, **kwargs)
+            query_cache.set(cache_key, loaded, tables=tables_read(query))
+            return loaded
+
+        # Only one caller per key runs the query; the others wait for it
+        return in_flight.do(cache_key, load, timeout=wait_timeout)
     return wrapper
 
 @with_db_connection
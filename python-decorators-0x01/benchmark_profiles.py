@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from db_pool import ConnectionPool
+from sqlite_profiles import PROFILES
+
+SEED = 1234
+
+def create_users(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT
+        )
+    ''')
+    conn.commit()
+
+def user_rows(start, count):
+    return [(i, f"User {i}", f"user{i}@example.com") for i in range(start, start + count)]
+
+def bulk_insert(pool, users, operations, threads):
+    """Seed users in chunks of 1000 rows, one commit per chunk."""
+    with pool.connection() as conn:
+        for start in range(1, users + 1, 1000):
+            conn.executemany("INSERT INTO users (id, name, email) VALUES (?, ?, ?)",
+                             user_rows(start, min(1000, users + 1 - start)))
+            conn.commit()
+    return users
+
+def update_email(pool, users, operations, threads):
+    """update_user_email: one UPDATE and one commit per call (2-transactional)."""
+    rng = random.Random(SEED)
+    with pool.connection() as conn:
+        for i in range(operations):
+            conn.execute("UPDATE users SET email = ? WHERE id = ?", (f"new{i}@example.com", rng.randint(1, users)))
+            conn.commit()
+    return operations
+
+def point_read(pool, users, operations, threads):
+    """get_user_by_id: SELECT one user by primary key (1-with_db_connection)."""
+    rng = random.Random(SEED)
+    with pool.connection() as conn:
+        for _ in range(operations):
+            conn.execute("SELECT * FROM users WHERE id = ?", (rng.randint(1, users),)).fetchone()
+    return operations
+
+def full_scan(pool, users, operations, threads):
+    """fetch_all_users: SELECT * FROM users (0-log_queries, 4-cache_query)."""
+    scans = max(1, operations // 100)
+    with pool.connection() as conn:
+        for _ in range(scans):
+            conn.execute("SELECT * FROM users").fetchall()
+    return scans
+
+def mixed_concurrent(pool, users, operations, threads):
+    """threads pooled callers doing 90% point reads and 10% committed updates."""
+    errors = []
+
+    def worker(index):
+        rng = random.Random(SEED + index)
+        try:
+            for i in range(operations // threads):
+                with pool.connection() as conn:
+                    user_id = rng.randint(1, users)
+                    if rng.random() < 0.1:
+                        conn.execute("UPDATE users SET email = ? WHERE id = ?", (f"m{index}.{i}@example.com", user_id))
+                        conn.commit()
+                    else:
+                        conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return operations // threads * threads
+
+WORKLOADS = {
+    'bulk_insert': bulk_insert,
+    'update_email': update_email,
+    'point_read': point_read,
+    'full_scan': full_scan,
+    'mixed_concurrent': mixed_concurrent,
+}
+
+def run_profile(profile, directory, users, operations, threads, workloads):
+    """Run the workloads in order against a fresh database tuned with profile."""
+    path = os.path.join(directory, f"users-{profile}.db")
+    pool = ConnectionPool(path, max_size=threads, profile=profile)
+    try:
+        with pool.connection() as conn:
+            create_users(conn)
+        results = []
+        for name in workloads:
+            start = time.perf_counter()
+            done = WORKLOADS[name](pool, users, operations, threads)
+            elapsed = time.perf_counter() - start
+            results.append({
+                'profile': profile,
+                'workload': name,
+                'operations': done,
+                'seconds': round(elapsed, 6),
+                'ops_per_sec': round(done / elapsed, 1) if elapsed > 0 else None,
+            })
+            print(f"{profile:<12} {name:<18} {results[-1]['ops_per_sec'] or 0:>12.0f} ops/s", file=sys.stderr)
+        return results
+    finally:
+        pool.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare the sqlite_profiles tuning profiles on the users table workloads of the decorator scripts.")
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS), default=list(WORKLOADS),
+                        help="run in order; bulk_insert seeds the table the others use")
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--operations', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--directory', help="where to create the databases (default: a temporary directory)")
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    directory = args.directory
+    if directory is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        directory = temp_dir.name
+    try:
+        results = []
+        for profile in args.profiles:
+            results.extend(run_profile(profile, directory, args.users, args.operations, args.threads, args.workloads))
+    finally:
+        if temp_dir:
+            temp_dir.cleanup()
+
+    report = {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'users': args.users,
+        'operations': args.operations,
+        'threads': args.threads,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from sqlite_profiles import DEFAULT_PROFILE, apply_profile, profile_pragmas
+
+class ConnectionPool:
+    """A thread-safe pool of SQLite connections.
+
+    Keeps between min_size and max_size connections. Idle connections above
+    min_size are closed after idle_timeout seconds, connections that sat
+    idle longer than health_check_interval are pinged before being handed
+    out, and a thread gets back the connection it used last when that one is
+    free (per-thread affinity keeps SQLite's statement cache warm).
+
+    profile names a tuning profile from sqlite_profiles (or gives the
+    PRAGMAs directly); it is applied once to every new connection.
+    """
+
+    def __init__(self, database, min_size=1, max_size=5, idle_timeout=300.0,
+                 acquire_timeout=30.0, health_check_interval=30.0, profile=DEFAULT_PROFILE):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.database = database
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.profile = profile_pragmas(profile)  # Fails early on unknown profile names
+        self._idle = []  # [connection, idle_since] pairs, most recently released last
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        for _ in range(min_size):
+            self._idle.append([self._connect(), time.monotonic()])
+            self._size += 1
+
+    def _connect(self):
+        # Connections move between threads, but only one thread uses each at a time
+        conn = sqlite3.connect(self.database, check_same_thread=False)
+        try:
+            apply_profile(conn, self.profile)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        """Close a connection that is leaving the pool (lock must be held)."""
+        self._size -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._condition.notify()
+
+    def _evict_idle(self, now):
+        """Close connections idle for longer than idle_timeout, keeping min_size (lock held)."""
+        keep = []
+        for entry in self._idle:
+            if now - entry[1] > self.idle_timeout and self._size > self.min_size:
+                self._discard(entry[0])
+            else:
+                keep.append(entry)
+        self._idle = keep
+
+    def _take_idle(self):
+        """Pop this thread's previous connection if idle, else the most recently used one (lock held)."""
+        preferred = getattr(self._local, 'conn', None)
+        for index, entry in enumerate(self._idle):
+            if entry[0] is preferred:
+                return self._idle.pop(index)
+        return self._idle.pop()
+
+    def acquire(self, timeout=None):
+        """Borrow a connection, waiting up to timeout seconds when the pool is exhausted."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    now = time.monotonic()
+                    self._evict_idle(now)
+                    if self._idle:
+                        conn, idle_since = self._take_idle()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn, idle_since = None, now
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise TimeoutError(f"No connection available from pool for {self.database}")
+                    self._condition.wait(remaining)
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+            elif now - idle_since > self.health_check_interval and not self._is_healthy(conn):
+                with self._condition:
+                    self._discard(conn)
+                continue
+            self._local.conn = conn
+            return conn
+
+    def release(self, conn):
+        """Return a borrowed connection; any open transaction is rolled back."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._condition:
+                self._discard(conn)
+            return
+        with self._condition:
+            if self._closed:
+                self._discard(conn)
+                return
+            self._idle.append([conn, time.monotonic()])
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that borrows a connection and always returns it."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections now and borrowed ones as they are released."""
+        with self._condition:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._condition.notify_all()
+
+    @property
+    def size(self):
+        """Number of open connections, idle or borrowed."""
+        return self._size
+
+    @property
+    def idle(self):
+        """Number of idle connections."""
+        return len(self._idle)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(database='users.db', **options):
+    """Return the process-wide pool for database, creating it with options on first use."""
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None or pool._closed:
+            pool = _pools[database] = ConnectionPool(database, **options)
+        return pool
+
+def close_pools():
+    """Close every pool created by get_pool."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
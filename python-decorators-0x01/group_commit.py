@@ -0,0 +1,185 @@
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from result_cache import invalidate_tables, tables_written
+
+_STOP = object()
+logger = logging.getLogger(__name__)
+
+class GroupCommitWriter:
+    """Runs write functions from many threads on one connection, committing them in groups.
+
+    submit() queues func(conn, *args, **kwargs) and returns a Future. The
+    writer thread collects up to max_batch calls, waiting at most max_delay
+    seconds after the first, runs each inside its own SAVEPOINT and commits
+    the whole group at once, so the group shares one fsync. A call that
+    raises is rolled back to its savepoint and its Future gets the
+    exception; the rest of the group still commits. Futures resolve only
+    after the COMMIT, i.e. once the write is durable. Write functions must
+    not commit or roll back themselves.
+    """
+
+    def __init__(self, database, max_batch=100, max_delay=0.005, timeout=30.0):
+        self.database = database
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def _start(self):
+        """Start the writer thread on first use, or again after it died (lock held)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"group-commit:{self.database}", daemon=True)
+            self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a write; the Future resolves to its result after the group commits."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Group commit writer is closed")
+            self._start()
+            self._queue.put((future, func, args, kwargs))
+        return future
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        conn = None
+        batch = []
+        error = None
+        try:
+            conn = sqlite3.connect(self.database, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            written = set()
+            conn.set_trace_callback(lambda statement: written.update(tables_written(statement)))
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                batch = self._collect(first)
+                written.clear()
+                outcomes = self._commit_batch(conn, batch)
+                if written:
+                    try:
+                        invalidate_tables(set(written))
+                    except Exception:
+                        logger.exception("Cache invalidation after group commit failed")
+                for future, outcome, failed in outcomes:
+                    if failed:
+                        future.set_exception(outcome)
+                    else:
+                        future.set_result(outcome)
+                batch = []
+        except BaseException as e:
+            error = e
+            logger.exception("Group commit writer for %s stopped", self.database)
+        finally:
+            if conn is not None:
+                conn.close()
+            self._stopped(batch, error)
+
+    def _stopped(self, batch, error):
+        """Fail every write that will not run; the next submit() starts a new thread."""
+        with self._lock:
+            self._thread = None
+            pending = [item for item in batch if not item[0].done()]
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    pending.append(item)
+        for future, _, _, _ in pending:
+            if not future.done():
+                stopped = RuntimeError(f"Group commit writer for {self.database} stopped")
+                stopped.__cause__ = error
+                future.set_exception(stopped)
+
+    def _commit_batch(self, conn, batch):
+        """Run a batch in one transaction and return (future, outcome, failed) triples."""
+        outcomes = []
+        live = [item for item in batch if item[0].set_running_or_notify_cancel()]
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            return [(future, e, True) for future, _, _, _ in live]
+        try:
+            for index, (future, func, args, kwargs) in enumerate(live):
+                savepoint = f"group_write_{index}"
+                conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    result = func(conn, *args, **kwargs)
+                except BaseException as e:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                    outcomes.append((future, e, True))
+                else:
+                    conn.execute(f"RELEASE {savepoint}")
+                    outcomes.append((future, result, False))
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            # The group's transaction is lost (e.g. a write committed or rolled back itself)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return [(future, e, True) for future, _, _, _ in live]
+        self.batches += 1
+        self.writes += len(live)
+        return outcomes
+
+    def flush(self):
+        """Block until everything submitted so far has been committed."""
+        self.submit(lambda conn: None).result()
+
+    def close(self):
+        """Commit what is queued, then stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_writer(database='users.db', **options):
+    """Return the process-wide group commit writer for database, creating it with options on first use."""
+    with _writers_lock:
+        writer = _writers.get(database)
+        if writer is None or writer._closed:
+            writer = _writers[database] = GroupCommitWriter(database, **options)
+        return writer
+
+@atexit.register
+def close_writers():
+    """Commit pending writes and stop every writer created by get_writer."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
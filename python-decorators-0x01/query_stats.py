@@ -0,0 +1,138 @@
+import functools
+import json
+import re
+import sys
+import threading
+from result_cache import normalize_sql
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint(query):
+    """Query shape with literals replaced by ?, so "id = 1" and "id = 2" share stats."""
+    shape = _NUMBER.sub("?", _LITERAL.sub("?", normalize_sql(query)))
+    return _IN_LIST.sub("(?+)", shape)
+
+def _bucket(value):
+    # Four buckets per power of two: index ranges are at most 25% wide
+    bits = value.bit_length()
+    if bits <= 3:
+        return value
+    return (bits - 3) * 4 + (value >> (bits - 3))
+
+def _bucket_bounds(index):
+    if index < 8:
+        return index, index + 1
+    shift, mantissa = index // 4 - 1, index % 4 + 4
+    return mantissa << shift, (mantissa + 1) << shift
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in nanoseconds (constant memory, ~12% error)."""
+
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        index = _bucket(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100): the midpoint of the bucket it falls in."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min((low + high) // 2, self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+class QueryStats:
+    """Per-fingerprint latency histograms, row counts and callers, safe to share between threads.
+
+    Set enabled to False to skip recording entirely. Counts only cover
+    the calls that were sampled.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, query, elapsed_ns, rows=None, caller=None):
+        key = fingerprint(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {'histogram': LatencyHistogram(), 'rows': 0, 'callers': {}}
+            entry['histogram'].record(elapsed_ns)
+            if rows is not None:
+                entry['rows'] += rows
+            if caller is not None:
+                entry['callers'][caller] = entry['callers'].get(caller, 0) + 1
+
+    def summary(self, key):
+        """Stats of one fingerprint as a dict, times in milliseconds."""
+        with self._lock:
+            entry = self._entries[key]
+            histogram = entry['histogram']
+            callers = sorted(entry['callers'].items(), key=lambda item: -item[1])
+            return {
+                'fingerprint': key,
+                'calls': histogram.count,
+                'rows': entry['rows'],
+                'mean_ms': histogram.mean / 1e6,
+                'p50_ms': histogram.percentile(50) / 1e6,
+                'p95_ms': histogram.percentile(95) / 1e6,
+                'p99_ms': histogram.percentile(99) / 1e6,
+                'max_ms': histogram.max / 1e6,
+                'callers': [caller for caller, _ in callers[:3]],
+            }
+
+    def top(self, n=10, by='p99_ms'):
+        """The n slowest fingerprints, ordered by the given summary field."""
+        with self._lock:
+            keys = list(self._entries)
+        summaries = [self.summary(key) for key in keys]
+        summaries.sort(key=lambda summary: summary[by], reverse=True)
+        return summaries[:n]
+
+    def export(self, n=10, file=None, format='text', by='p99_ms'):
+        """Write the top-n slowest fingerprints to file (stdout) as a table or JSON lines."""
+        file = file or sys.stdout
+        rows = self.top(n, by)
+        if format == 'json':
+            for row in rows:
+                file.write(json.dumps(row) + "\n")
+            return
+        file.write(f"{'calls':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'rows':>8}  query\n")
+        for row in rows:
+            file.write(f"{row['calls']:>8} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} "
+                       f"{row['p99_ms']:>9.3f} {row['max_ms']:>9.3f} {row['rows']:>8}  {row['fingerprint']}\n")
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# Process-wide stats used by log_queries
+query_stats = QueryStats()
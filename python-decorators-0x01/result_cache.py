@@ -0,0 +1,654 @@
+import fnmatch
+import functools
+import hashlib
+import logging
+import pickle
+import re
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+# Returned by QueryCache.get on a miss (None is a valid cached result)
+MISS = object()
+logger = logging.getLogger(__name__)
+
+_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+[`\"\[]?(\w+)", re.IGNORECASE)
+_WRITE_TABLES = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[`\"\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+def normalize_sql(query):
+    """Collapse whitespace (outside string literals) and drop a trailing semicolon."""
+    parts = _LITERAL.split(query)
+    for index in range(0, len(parts), 2):
+        parts[index] = re.sub(r"\s+", " ", parts[index])
+    return "".join(parts).strip().rstrip(";").rstrip()
+
+def tables_read(query):
+    """Lower-cased names of the tables a SELECT reads from."""
+    return frozenset(name.lower() for name in _READ_TABLES.findall(_LITERAL.sub("''", query)))
+
+def tables_written(query):
+    """Lower-cased name of the table an INSERT/REPLACE/UPDATE/DELETE writes to."""
+    match = _WRITE_TABLES.match(query)
+    return frozenset([match.group(1).lower()]) if match else frozenset()
+
+def estimate_size(value):
+    """Approximate memory footprint of a query result in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return size
+
+def _freeze(value):
+    """Hashable equivalent of a query parameter (sqlite3 takes lists and dicts too)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return ('named', tuple(sorted((key, _freeze(item)) for key, item in value.items())))
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return value
+
+def make_key(query, args=(), kwargs=None):
+    """Cache key for a query: normalized SQL plus its parameters."""
+    params = _freeze(tuple(args))
+    if kwargs:
+        params += tuple(sorted((key, _freeze(value)) for key, value in kwargs.items()))
+    return normalize_sql(query), params
+
+class QueryCache:
+    """A thread-safe, in-process LRU cache for query results with TTLs and table-level invalidation.
+
+    Entries are evicted least-recently-used first once either max_entries or
+    max_bytes (estimated result size) is exceeded, and expire ttl seconds
+    after being stored. Each entry remembers the tables it read, so
+    invalidate_tables() can drop everything a write may have made stale.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires_at, tables)
+        self._by_table = {}  # table -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def _remove(self, key):
+        value, size, expires_at, tables = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def get(self, key, record=True):
+        """Return the cached value for key, or MISS; record=False leaves hits/misses alone."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return MISS
+            if entry[2] is not None and entry[2] <= self.clock():
+                self._remove(key)
+                if record:
+                    self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            if record:
+                self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, tables=(), ttl=None):
+        """Store value under key; tables are the tables the query read."""
+        ttl = self.ttl if ttl is None else ttl
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = self.clock() + ttl if ttl else None
+        tables = frozenset(tables)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at, tables)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_tables(self, tables):
+        """Drop every entry that read any of tables; returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for table in tables:
+                for key in list(self._by_table.get(table.lower(), ())):
+                    self._remove(key)
+                    dropped += 1
+        return dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        """Estimated bytes held by cached results."""
+        return self._bytes
+
+_caches = weakref.WeakSet()
+
+def invalidate_tables(tables):
+    """Invalidate tables in every live cache of this process; one failing cache does not stop the rest."""
+    dropped = 0
+    for cache in list(_caches):
+        try:
+            dropped += cache.invalidate_tables(tables)
+        except Exception:
+            logger.exception("Invalidating %s in %s failed", sorted(tables), type(cache).__name__)
+    return dropped
+
+# Shared (cross-process) backends. They store pickled results, so the
+# cache file or server must only be writable by trusted processes.
+
+_COMPRESS_THRESHOLD = 512
+_RAW, _ZLIB = b"r", b"z"
+
+def dumps(value):
+    """Serialize a result compactly: pickle, zlib-compressed when large."""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > _COMPRESS_THRESHOLD:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return _ZLIB + compressed
+    return _RAW + data
+
+def loads(data):
+    """Inverse of dumps."""
+    data = bytes(data)
+    if data[:1] == _ZLIB:
+        return pickle.loads(zlib.decompress(data[1:]))
+    return pickle.loads(data[1:])
+
+class RespError(Exception):
+    """An error reply from a Redis-protocol server."""
+
+# An unreachable or broken shared store is treated as a cache miss or a
+# no-op: the query then simply runs against the database.
+_STORE_ERRORS = (OSError, sqlite3.Error, RespError)
+
+def _degrade(default):
+    """Decorate a backend method so store errors are logged and default is returned."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except _STORE_ERRORS as e:
+                self.errors += 1
+                logger.warning("%s.%s failed: %s", type(self).__name__, method.__name__, e)
+                return default
+        return wrapper
+    return decorator
+
+def key_digest(key):
+    """Stable string form of a cache key, identical in every process."""
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+class SQLiteCache:
+    """Query result cache in a SQLite file shared by every process on the host.
+
+    Survives restarts. Entries expire after ttl seconds (wall clock) and
+    the oldest entries are trimmed once more than max_entries are stored.
+    """
+
+    def __init__(self, path, max_entries=10000, ttl=300.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            expires_at REAL,
+            stored_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS cache_tables (
+            table_name TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (table_name, key)
+        );
+        CREATE INDEX IF NOT EXISTS cache_entries_stored_at ON cache_entries (stored_at);
+        CREATE INDEX IF NOT EXISTS cache_tables_key ON cache_tables (key);
+        DELETE FROM cache_tables WHERE key NOT IN (SELECT key FROM cache_entries);
+        """)
+        _caches.add(self)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @_degrade(MISS)
+    def get(self, key, record=True):
+        found = self._conn().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key_digest(key),)
+        ).fetchone()
+        if found is None or (found[1] is not None and found[1] <= time.time()):
+            if record:
+                self.misses += 1
+            return MISS
+        if record:
+            self.hits += 1
+        return loads(found[0])
+
+    @_degrade(None)
+    def set(self, key, value, tables=(), ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        digest = key_digest(key)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (digest, dumps(value), now + ttl if ttl else None, now),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tables (table_name, key) VALUES (?, ?)",
+                [(table.lower(), digest) for table in tables],
+            )
+            expired = conn.execute(
+                "SELECT key FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ? "
+                "UNION SELECT key FROM (SELECT key FROM cache_entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (now, self.max_entries),
+            ).fetchall()
+            self._delete(conn, [key for (key,) in expired])
+
+    def _delete(self, conn, keys):
+        """Delete entries and their table index rows (inside the caller's transaction)."""
+        params = [(key,) for key in keys]
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", params)
+        conn.executemany("DELETE FROM cache_tables WHERE key = ?", params)
+        return len(params)
+
+    @_degrade(0)
+    def invalidate_tables(self, tables):
+        conn = self._conn()
+        keys = set()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for table in tables:
+                keys.update(key for (key,) in conn.execute(
+                    "SELECT key FROM cache_tables WHERE table_name = ?", (table.lower(),)))
+            # Also drops the entries' rows under their other tables
+            return self._delete(conn, keys)
+
+    @_degrade(None)
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_tables")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+def _read_reply(stream):
+    """Read one RESP reply from a binary file-like object."""
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode('utf-8')
+    if kind == b"-":
+        raise RespError(payload.decode('utf-8'))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        return None if count < 0 else [_read_reply(stream) for _ in range(count)]
+    raise RespError(f"Unexpected reply type: {line!r}")
+
+def _encode_command(*args):
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode('utf-8')
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+class RedisCache:
+    """Query result cache on a Redis-protocol server shared by every process.
+
+    Speaks plain RESP over one socket per thread, so it works with Redis
+    itself or with the RespServer stand-in below. Entries expire through
+    PX; each table keeps a set of the keys that read it for invalidation,
+    which expires with the longest-lived entry it lists.
+    """
+
+    def __init__(self, host='127.0.0.1', port=6379, prefix='query_cache', ttl=300.0, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self.ttl = ttl
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local = threading.local()
+        _caches.add(self)
+
+    def _stream(self):
+        stream = getattr(self._local, 'stream', None)
+        if stream is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            stream = self._local.stream = sock.makefile('rwb')
+        return stream
+
+    def execute(self, *args):
+        """Send one command and return its reply."""
+        stream = self._stream()
+        try:
+            stream.write(_encode_command(*args))
+            stream.flush()
+            return _read_reply(stream)
+        except (OSError, ConnectionError):
+            self._local.stream = None
+            stream.close()
+            raise
+
+    def _entry_key(self, key):
+        return f"{self.prefix}:entry:{key_digest(key)}"
+
+    def _table_key(self, table):
+        return f"{self.prefix}:table:{table.lower()}"
+
+    @_degrade(MISS)
+    def get(self, key, record=True):
+        data = self.execute("GET", self._entry_key(key))
+        if data is None:
+            if record:
+                self.misses += 1
+            return MISS
+        if record:
+            self.hits += 1
+        return loads(data)
+
+    @_degrade(None)
+    def set(self, key, value, tables=(), ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        entry_key = self._entry_key(key)
+        if ttl:
+            self.execute("SET", entry_key, dumps(value), "PX", int(ttl * 1000))
+        else:
+            self.execute("SET", entry_key, dumps(value))
+        for table in tables:
+            table_key = self._table_key(table)
+            # Keep the set as long as its longest-lived member; PTTL -1 means no expiry
+            remaining = self.execute("PTTL", table_key)  # -2: the set does not exist yet
+            self.execute("SADD", table_key, entry_key)
+            if not ttl:
+                if remaining != -1:
+                    self.execute("PERSIST", table_key)
+            elif remaining == -2 or (remaining >= 0 and remaining < ttl * 1000):
+                self.execute("PEXPIRE", table_key, int(ttl * 1000))
+
+    @_degrade(0)
+    def invalidate_tables(self, tables):
+        dropped = 0
+        for table in tables:
+            table_key = self._table_key(table)
+            members = self.execute("SMEMBERS", table_key) or []
+            if members:
+                dropped += self.execute("DEL", *members)
+            self.execute("DEL", table_key)
+        return dropped
+
+    @_degrade(None)
+    def clear(self):
+        keys = self.execute("KEYS", f"{self.prefix}:*") or []
+        if keys:
+            self.execute("DEL", *keys)
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """A tiny in-memory Redis-protocol server for local use and tests.
+
+    Supports PING, GET, SET (EX/PX), DEL, EXISTS, SADD, SMEMBERS, PEXPIRE,
+    PTTL, PERSIST, KEYS and FLUSHDB - enough for RedisCache. Not persistent.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _RespHandler)
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def address(self):
+        return self.server_address[0], self.server_address[1]
+
+    def start(self):
+        """Serve in a background thread and return (host, port)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="resp-server", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def _live(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def dispatch(self, command, args):
+        with self.lock:
+            if command == b"PING":
+                return "+PONG"
+            if command == b"GET":
+                return self.data[args[0]] if self._live(args[0]) else None
+            if command == b"SET":
+                key, value = args[0], args[1]
+                self.data[key] = value
+                self.expires.pop(key, None)
+                options = [arg.upper() for arg in args[2:]]
+                if len(options) >= 2 and options[0] in (b"PX", b"EX"):
+                    scale = 1000.0 if options[0] == b"PX" else 1.0
+                    self.expires[key] = time.monotonic() + int(options[1]) / scale
+                return "+OK"
+            if command == b"DEL":
+                removed = 0
+                for key in args:
+                    if self._live(key):
+                        removed += 1
+                    self.data.pop(key, None)
+                    self.expires.pop(key, None)
+                return removed
+            if command == b"EXISTS":
+                return sum(1 for key in args if self._live(key))
+            if command == b"SADD":
+                members = self.data.setdefault(args[0], set()) if self._live(args[0]) else None
+                if members is None:
+                    members = self.data[args[0]] = set()
+                before = len(members)
+                members.update(args[1:])
+                return len(members) - before
+            if command == b"PEXPIRE":
+                if not self._live(args[0]):
+                    return 0
+                self.expires[args[0]] = time.monotonic() + int(args[1]) / 1000.0
+                return 1
+            if command == b"PTTL":
+                if not self._live(args[0]):
+                    return -2
+                expires_at = self.expires.get(args[0])
+                return -1 if expires_at is None else max(0, int((expires_at - time.monotonic()) * 1000))
+            if command == b"PERSIST":
+                return 1 if self._live(args[0]) and self.expires.pop(args[0], None) is not None else 0
+            if command == b"SMEMBERS":
+                return sorted(self.data[args[0]]) if self._live(args[0]) else []
+            if command == b"KEYS":
+                pattern = args[0].decode('utf-8')
+                return [key for key in list(self.data)
+                        if self._live(key) and fnmatch.fnmatchcase(key.decode('utf-8'), pattern)]
+            if command == b"FLUSHDB":
+                self.data.clear()
+                self.expires.clear()
+                return "+OK"
+        return RespError(f"ERR unknown command '{command.decode('utf-8', 'replace')}'")
+
+class _RespHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                request = _read_reply(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            if not isinstance(request, list) or not request:
+                return
+            reply = self.server.dispatch(request[0].upper(), request[1:])
+            self.wfile.write(self._encode(reply))
+            self.wfile.flush()
+
+    def _encode(self, reply):
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, RespError):
+            return b"-" + str(reply).encode('utf-8') + b"\r\n"
+        if isinstance(reply, str) and reply.startswith("+"):
+            return reply.encode('utf-8') + b"\r\n"
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        if isinstance(reply, list):
+            return b"*%d\r\n" % len(reply) + b"".join(self._encode(item) for item in reply)
+        raise TypeError(f"Cannot encode reply {reply!r}")
+
+def cache_from_url(url, **options):
+    """Build a cache backend from a URL.
+
+    * memory://                  - in-process QueryCache (default)
+    * sqlite:///path/to/cache.db - SQLiteCache shared through a file
+    * redis://host:port/prefix   - RedisCache on a Redis-protocol server
+
+    options are passed to the backend (max_entries, ttl, ...); options a
+    backend does not take are ignored.
+    """
+    parsed = urlparse(url or "memory://")
+    if parsed.scheme in ("", "memory"):
+        return QueryCache(**options)
+    if parsed.scheme == "sqlite":
+        # sqlite:///cache.db is relative, sqlite:////tmp/cache.db absolute
+        path = (parsed.netloc + parsed.path)[1:] if not parsed.netloc else parsed.netloc + parsed.path
+        allowed = {k: v for k, v in options.items() if k in ("max_entries", "ttl")}
+        return SQLiteCache(path, **allowed)
+    if parsed.scheme == "redis":
+        allowed = {k: v for k, v in options.items() if k in ("ttl", "timeout")}
+        prefix = parsed.path.strip("/") or "query_cache"
+        return RedisCache(parsed.hostname or '127.0.0.1', parsed.port or 6379, prefix=prefix, **allowed)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+class _Call:
+    """One in-flight execution shared by SingleFlight callers."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is running wait (up to timeout seconds) and receive the same result, or
+    the same exception if it failed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        if not call.done.wait(timeout):
+            raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call {key!r}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        """Number of keys currently being executed."""
+        return len(self._calls)
@@ -0,0 +1,289 @@
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Contention: another connection holds the lock, trying again can succeed
+LOCK_ERRORS = ("database is locked", "database table is locked", "database schema is locked", "database is busy")
+# Other failures that are worth another attempt
+TRANSIENT_ERRORS = ("disk i/o error", "unable to open database file")
+
+def is_lock_error(error):
+    """True for SQLite lock contention (SQLITE_BUSY / SQLITE_LOCKED)."""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and any(text in message for text in LOCK_ERRORS)
+
+def is_retryable(error):
+    """True for errors a retry can fix; syntax errors, missing tables etc. are real failures."""
+    if is_lock_error(error):
+        return True
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and any(text in message for text in TRANSIENT_ERRORS)
+
+def backoff(attempt, base, cap, rng=random):
+    """Full-jitter exponential backoff: a random wait in [0, min(cap, base * 2**attempt)]."""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+class RetryStats:
+    """Thread-safe counters describing how often a retried function needed another attempt."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.successes = 0
+            self.failures = 0
+            self.retries = 0
+            self.lock_errors = 0
+            self.deadline_exceeded = 0
+            self.circuit_open = 0
+            self.budget_exhausted = 0
+            self.sleep_seconds = 0.0
+            self.attempts = {}  # attempts per call -> number of calls
+
+    def record_retry(self, error, slept):
+        with self._lock:
+            self.retries += 1
+            self.sleep_seconds += slept
+            if is_lock_error(error):
+                self.lock_errors += 1
+
+    def record_call(self, attempts, succeeded, deadline_exceeded=False, circuit_open=False,
+                    budget_exhausted=False):
+        with self._lock:
+            self.calls += 1
+            self.attempts[attempts] = self.attempts.get(attempts, 0) + 1
+            if succeeded:
+                self.successes += 1
+            else:
+                self.failures += 1
+            if deadline_exceeded:
+                self.deadline_exceeded += 1
+            if circuit_open:
+                self.circuit_open += 1
+            if budget_exhausted:
+                self.budget_exhausted += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.failures,
+                'retries': self.retries,
+                'lock_errors': self.lock_errors,
+                'deadline_exceeded': self.deadline_exceeded,
+                'circuit_open': self.circuit_open,
+                'budget_exhausted': self.budget_exhausted,
+                'sleep_seconds': round(self.sleep_seconds, 6),
+                'attempts': dict(sorted(self.attempts.items())),
+            }
+
+class CircuitOpenError(sqlite3.OperationalError):
+    """Raised instead of calling the database while a circuit breaker is open."""
+
+class RetryBudgetExhausted(sqlite3.OperationalError):
+    """Raised when a retry is needed but the process-wide retry budget is spent."""
+
+class RollingWindow:
+    """Counts of events over the last window seconds, kept in buckets of window / buckets."""
+
+    def __init__(self, window=10.0, buckets=10, clock=time.monotonic):
+        self.window = window
+        self.width = window / buckets
+        self.clock = clock
+        self._buckets = deque()  # [bucket_start, {event: count}]
+
+    def _trim(self, now):
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+    def add(self, event, count=1):
+        now = self.clock()
+        self._trim(now)
+        start = now - now % self.width
+        if not self._buckets or self._buckets[-1][0] != start:
+            self._buckets.append([start, {}])
+        counts = self._buckets[-1][1]
+        counts[event] = counts.get(event, 0) + count
+
+    def total(self, event):
+        self._trim(self.clock())
+        return sum(counts.get(event, 0) for _, counts in self._buckets)
+
+    def clear(self):
+        self._buckets.clear()
+
+class RetryBudget:
+    """Caps retries at ratio of recent calls (plus min_retries) across the whole process.
+
+    While the database is healthy retries are rare and always allowed;
+    when everything fails, retries stop instead of multiplying the load.
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10, window=10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._lock = threading.Lock()
+        self._window = RollingWindow(window, clock=clock)
+        self.allowed = 0
+        self.exhausted = 0
+
+    def record_call(self):
+        with self._lock:
+            self._window.add('calls')
+
+    def try_spend(self):
+        """Take one retry from the budget; False when none is left."""
+        with self._lock:
+            limit = self.min_retries + self.ratio * self._window.total('calls')
+            if self._window.total('retries') >= limit:
+                self.exhausted += 1
+                return False
+            self._window.add('retries')
+            self.allowed += 1
+            return True
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'calls': self._window.total('calls'),
+                'retries': self._window.total('retries'),
+                'allowed': self.allowed,
+                'exhausted': self.exhausted,
+            }
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker driven by a rolling error rate.
+
+    Closed: calls go through; once at least min_calls were made in the
+    last window seconds and failure_rate of them failed, the breaker opens.
+    Open: calls fail fast with CircuitOpenError for reset_timeout seconds.
+    Half-open: up to half_open_calls trial calls go through; a success
+    closes the breaker, a failure opens it again.
+
+    Transition counts and rejections are kept for metrics, and listeners
+    are called as listener(breaker, old_state, new_state).
+    """
+
+    def __init__(self, name, failure_rate=0.5, min_calls=10, window=10.0, reset_timeout=30.0,
+                 half_open_calls=1, clock=time.monotonic):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._window = RollingWindow(window, clock=clock)
+        self._state = CLOSED
+        self._opened_at = None
+        self._trials = 0
+        self.transitions = {}
+        self.rejected = 0
+
+    def _transition(self, state):
+        """Switch state (lock held); returns the (old, new) pair for listeners."""
+        old, self._state = self._state, state
+        key = f"{old}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == CLOSED:
+            self._window.clear()
+        self._trials = 0
+        return old, state
+
+    def _notify(self, change):
+        if change:
+            for listener in self.listeners:
+                listener(self, *change)
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Permit one call or raise CircuitOpenError."""
+        change = None
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                change = self._transition(HALF_OPEN)
+            if self._state == OPEN or (self._state == HALF_OPEN and self._trials >= self.half_open_calls):
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+            if self._state == HALF_OPEN:
+                self._trials += 1
+        self._notify(change)
+
+    def release(self):
+        """Give back the trial slot of a call that ended without a database outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def record_success(self):
+        change = None
+        with self._lock:
+            if self._state == HALF_OPEN:
+                change = self._transition(CLOSED)
+            else:
+                self._window.add('success')
+        self._notify(change)
+
+    def record_failure(self):
+        change = None
+        with self._lock:
+            if self._state == HALF_OPEN:
+                change = self._transition(OPEN)
+            elif self._state == CLOSED:
+                self._window.add('failure')
+                failures = self._window.total('failure')
+                calls = failures + self._window.total('success')
+                if calls >= self.min_calls and failures >= self.failure_rate * calls:
+                    change = self._transition(OPEN)
+        self._notify(change)
+
+    def as_dict(self):
+        state = self.state
+        with self._lock:
+            failures = self._window.total('failure')
+            calls = failures + self._window.total('success')
+            return {
+                'name': self.name,
+                'state': state,
+                'error_rate': failures / calls if calls else 0.0,
+                'calls_in_window': calls,
+                'rejected': self.rejected,
+                'transitions': dict(self.transitions),
+            }
+
+# Process-wide retry budget shared by every retry_on_failure function
+retry_budget = RetryBudget()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name, **options):
+    """Return the process-wide circuit breaker for name (e.g. a database file)."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **options)
+        return breaker
+
+def breaker_metrics():
+    """Metrics of every breaker created by get_breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.as_dict() for breaker in breakers]
@@ -0,0 +1,48 @@
+import os
+
+# Named PRAGMA sets, applied in order when a connection is opened.
+# cache_size < 0 is in KiB; mmap_size is in bytes; busy_timeout in ms.
+PROFILES = {
+    # SQLite's own defaults: rollback journal, synchronous=FULL, 2 MiB cache, no mmap
+    'default': (),
+    # Many concurrent readers, occasional small writes (the decorator scripts)
+    'read-heavy': (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -64 * 1024),
+        ('mmap_size', 256 * 1024 * 1024),
+        ('temp_store', 'MEMORY'),
+        ('busy_timeout', 5000),
+    ),
+    # Large imports and rebuilds; a power loss can lose the last transactions
+    'bulk-load': (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'OFF'),
+        ('cache_size', -256 * 1024),
+        ('mmap_size', 256 * 1024 * 1024),
+        ('temp_store', 'MEMORY'),
+        ('busy_timeout', 30000),
+    ),
+}
+
+# Profile used by get_pool when none is given, e.g. SQLITE_PROFILE=read-heavy
+DEFAULT_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+
+def profile_pragmas(profile):
+    """PRAGMA (name, value) pairs of a profile given by name or as pairs/dict."""
+    if profile is None:
+        return ()
+    if isinstance(profile, str):
+        try:
+            return PROFILES[profile]
+        except KeyError:
+            raise ValueError(f"Unknown SQLite profile {profile!r}; choose from {', '.join(PROFILES)}") from None
+    return tuple(profile.items()) if isinstance(profile, dict) else tuple(profile)
+
+def apply_profile(conn, profile):
+    """Apply a profile's PRAGMAs to conn; returns the resulting settings."""
+    settings = {}
+    for name, value in profile_pragmas(profile):
+        conn.execute(f"PRAGMA {name} = {value}")
+        settings[name] = conn.execute(f"PRAGMA {name}").fetchone()[0]
+    return settings
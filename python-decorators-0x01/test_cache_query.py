@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Unit tests for the cache_query decorator."""
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+
+cache_module = __import__('4-cache_query')
+
+
+@cache_module.cache_query
+def fetch(conn, query, params=()):
+    fetch.calls += 1
+    return conn.execute(query, params).fetchall()
+
+
+class TestCacheQuery(unittest.TestCase):
+    """Test cases for cache_query."""
+
+    def setUp(self):
+        """Create a scratch users table and start with an empty cache."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.tmp.name, "users.db"))
+        self.conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        self.conn.execute("INSERT INTO users VALUES (1, 'Alice'), (2, 'Bob')")
+        self.conn.commit()
+        cache_module.query_cache.clear()
+        fetch.calls = 0
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def call(self, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fetch(self.conn, *args, **kwargs)
+
+    def test_list_parameters(self):
+        """Positional parameters given as a list are cached like a tuple."""
+        query = "SELECT name FROM users WHERE id = ?"
+        self.assertEqual(self.call(query, [1]), [('Alice',)])
+        self.assertEqual(self.call(query, [1]), [('Alice',)])
+        self.assertEqual(self.call(query, (1,)), [('Alice',)])
+        self.assertEqual(self.call(query, [2]), [('Bob',)])
+        self.assertEqual(fetch.calls, 2)
+
+    def test_dict_parameters(self):
+        """Named parameters given as a dict are cached per value."""
+        query = "SELECT name FROM users WHERE id = :id"
+        self.assertEqual(self.call(query, params={'id': 1}), [('Alice',)])
+        self.assertEqual(self.call(query, params={'id': 1}), [('Alice',)])
+        self.assertEqual(self.call(query, params={'id': 2}), [('Bob',)])
+        self.assertEqual(fetch.calls, 2)
+
+    def test_each_lookup_counts_once(self):
+        """A miss is counted once, not again by the single-flight re-check."""
+        cache = cache_module.query_cache
+        hits, misses = cache.hits, cache.misses
+        self.call("SELECT name FROM users")
+        self.call("SELECT name FROM users")
+        self.assertEqual((cache.hits - hits, cache.misses - misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Unit tests for the SQLite ConnectionPool."""
+import os
+import tempfile
+import threading
+import unittest
+from db_pool import ConnectionPool
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test cases for ConnectionPool."""
+
+    def setUp(self):
+        """Create a scratch database file."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "pool.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_acquire_times_out_when_exhausted(self):
+        """A full pool raises TimeoutError once acquire_timeout passes."""
+        pool = ConnectionPool(self.path, min_size=0, max_size=1)
+        conn = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        pool.release(conn)
+        pool.close()
+
+    def test_waiter_gets_released_connection(self):
+        """A blocked acquire is served as soon as a connection is released."""
+        pool = ConnectionPool(self.path, min_size=0, max_size=1)
+        conn = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+        waiter.start()
+        pool.release(conn)
+        waiter.join(5)
+        self.assertEqual(got, [conn])
+        pool.release(conn)
+        pool.close()
+
+    def test_idle_connections_above_min_size_are_evicted(self):
+        """Idle connections older than idle_timeout are closed down to min_size."""
+        pool = ConnectionPool(self.path, min_size=1, max_size=3, idle_timeout=0)
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns:
+            pool.release(conn)
+        self.assertEqual(pool.size, 3)
+        pool.release(pool.acquire())
+        self.assertEqual(pool.size, 1)
+        pool.close()
+
+    def test_release_rolls_back_open_transaction(self):
+        """Uncommitted work is discarded when a connection goes back to the pool."""
+        pool = ConnectionPool(self.path, min_size=0, max_size=1)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        pool.close()
+
+    def test_thread_gets_its_previous_connection_back(self):
+        """Per-thread affinity returns the connection this thread used last."""
+        pool = ConnectionPool(self.path, min_size=0, max_size=2)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(pool.acquire(), second)
+        pool.close()
+
+    def test_unknown_profile_is_rejected(self):
+        """Pools fail early on an unknown tuning profile."""
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.path, profile='nope')
+
+    def test_profile_is_applied_to_new_connections(self):
+        """Every pooled connection gets the profile's PRAGMAs."""
+        pool = ConnectionPool(self.path, min_size=0, max_size=1, profile='read-heavy')
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Unit tests for GroupCommitWriter."""
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from group_commit import GroupCommitWriter
+
+
+def insert(conn, value):
+    conn.execute("INSERT INTO t (x) VALUES (?)", (value,))
+    return value
+
+
+def fail(conn, value):
+    conn.execute("INSERT INTO t (x) VALUES (?)", (value,))
+    raise ValueError(value)
+
+
+class TestGroupCommitWriter(unittest.TestCase):
+    """Test cases for GroupCommitWriter."""
+
+    def setUp(self):
+        """Create a scratch database with one table."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "writes.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.close()
+        self.writer = GroupCommitWriter(self.path, max_delay=0.05)
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def rows(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return sorted(row[0] for row in conn.execute("SELECT x FROM t"))
+        finally:
+            conn.close()
+
+    def test_writes_are_committed_in_groups(self):
+        """Concurrent submits share commits and all resolve to their results."""
+        futures = [self.writer.submit(insert, i) for i in range(50)]
+        self.assertEqual([future.result(5) for future in futures], list(range(50)))
+        self.assertEqual(self.rows(), list(range(50)))
+        self.assertLess(self.writer.batches, 50)
+
+    def test_failure_is_isolated_to_its_call(self):
+        """A failing write is rolled back alone; the rest of its group commits."""
+        futures = [self.writer.submit(insert, 1), self.writer.submit(fail, 2), self.writer.submit(insert, 3)]
+        self.assertEqual(futures[0].result(5), 1)
+        with self.assertRaises(ValueError):
+            futures[1].result(5)
+        self.assertEqual(futures[2].result(5), 3)
+        self.assertEqual(self.rows(), [1, 3])
+
+    def test_base_exception_is_isolated_too(self):
+        """Even a BaseException from a write only fails that write."""
+        def interrupt(conn):
+            raise KeyboardInterrupt
+
+        futures = [self.writer.submit(insert, 1), self.writer.submit(interrupt), self.writer.submit(insert, 2)]
+        with self.assertRaises(KeyboardInterrupt):
+            futures[1].result(5)
+        self.assertEqual([futures[0].result(5), futures[2].result(5)], [1, 2])
+
+    def test_write_that_commits_fails_its_group(self):
+        """A write ending the transaction itself fails the group, not the writer."""
+        def commit(conn):
+            conn.execute("COMMIT")
+
+        futures = [self.writer.submit(insert, 1), self.writer.submit(commit)]
+        for future in futures:
+            with self.assertRaises(sqlite3.Error):
+                future.result(5)
+        self.assertEqual(self.writer.submit(insert, 2).result(5), 2)
+
+    def test_dead_writer_fails_pending_and_restarts(self):
+        """When the writer thread dies, pending writes fail and the next submit starts a new one."""
+        writer = GroupCommitWriter(os.path.join(self.tmp.name, "missing", "writes.db"))
+        with self.assertLogs('group_commit', 'ERROR'):
+            future = writer.submit(insert, 1)
+            with self.assertRaises(RuntimeError):
+                future.result(5)
+        writer.database = self.path
+        self.assertEqual(writer.submit(insert, 2).result(5), 2)
+        writer.close()
+
+    def test_flush_and_close(self):
+        """close() commits what was queued and rejects later submits."""
+        futures = [self.writer.submit(insert, i) for i in range(5)]
+        self.writer.close()
+        self.assertTrue(all(future.done() for future in futures))
+        with self.assertRaises(RuntimeError):
+            self.writer.submit(insert, 6)
+
+    def test_submit_from_many_threads(self):
+        """Writes submitted from several threads are all committed."""
+        futures = []
+        lock = threading.Lock()
+
+        def worker(start):
+            for i in range(start, start + 20):
+                future = self.writer.submit(insert, i)
+                with lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=worker, args=(n * 20,)) for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.writer.flush()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self.rows(), list(range(100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Unit tests for the query result caches and single-flight."""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+import result_cache
+from result_cache import (MISS, QueryCache, RedisCache, RespServer, SingleFlight, SQLiteCache,
+                          invalidate_tables, make_key, tables_read, tables_written)
+
+
+class TestSqlParsing(unittest.TestCase):
+    """Test cases for the SQL helpers."""
+
+    def test_make_key_normalizes_whitespace(self):
+        """Queries differing only in whitespace share a key."""
+        self.assertEqual(make_key("SELECT *\n  FROM users;"), make_key("SELECT * FROM users"))
+
+    def test_make_key_accepts_list_and_dict_parameters(self):
+        """sqlite3's list and dict parameter forms give hashable keys."""
+        self.assertEqual(make_key("SELECT * FROM users WHERE id = ?", ([1],)),
+                         make_key("SELECT * FROM users WHERE id = ?", ((1,),)))
+        named = make_key("SELECT * FROM users WHERE id = :id", ({'id': 1, 'name': ['a']},))
+        self.assertEqual(named, make_key("SELECT * FROM users WHERE id = :id", ({'name': ['a'], 'id': 1},)))
+        self.assertNotEqual(named, make_key("SELECT * FROM users WHERE id = :id", ({'id': 2, 'name': ['a']},)))
+        self.assertEqual(hash(make_key("SELECT 1", (), {'params': [bytearray(b'x')]})),
+                         hash(make_key("SELECT 1", (), {'params': [b'x']})))
+
+    def test_tables_read_and_written(self):
+        """Table names are extracted lower-cased, ignoring string literals."""
+        self.assertEqual(tables_read("SELECT * FROM Users JOIN orders WHERE x = 'FROM t'"),
+                         {"users", "orders"})
+        self.assertEqual(tables_written("UPDATE users SET email = ?"), {"users"})
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test cases for the in-process QueryCache."""
+
+    def test_lru_eviction_by_entries(self):
+        """The least recently used entry goes first."""
+        cache = QueryCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIs(cache.get("b"), MISS)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_eviction_by_bytes(self):
+        """Entries are evicted to stay under max_bytes."""
+        cache = QueryCache(max_entries=100, max_bytes=2000)
+        for i in range(10):
+            cache.set(i, "x" * 500)
+        self.assertLessEqual(cache.size_bytes, 2000)
+        self.assertLess(len(cache), 10)
+
+    def test_ttl_expiry(self):
+        """Entries expire after their ttl."""
+        now = [0.0]
+        cache = QueryCache(ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 11
+        self.assertIs(cache.get("a"), MISS)
+
+    def test_unrecorded_lookup(self):
+        """get(record=False) does not change the hit and miss counts."""
+        cache = QueryCache()
+        cache.get("a", record=False)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a", record=False), 1)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_none_is_cacheable(self):
+        """None is a valid cached result, distinct from MISS."""
+        cache = QueryCache()
+        cache.set("a", None)
+        self.assertIsNone(cache.get("a"))
+
+    def test_invalidate_tables(self):
+        """Invalidating a table drops only the entries that read it."""
+        cache = QueryCache()
+        cache.set("users", 1, tables={"users"})
+        cache.set("orders", 2, tables={"orders"})
+        invalidate_tables({"users"})
+        self.assertIs(cache.get("users"), MISS)
+        self.assertEqual(cache.get("orders"), 2)
+
+    def test_module_invalidation_isolates_failing_caches(self):
+        """One failing cache does not stop invalidation of the others."""
+        class Broken:
+            def invalidate_tables(self, tables):
+                raise RuntimeError("down")
+
+        broken = Broken()
+        cache = QueryCache()
+        cache.set("users", 1, tables={"users"})
+        result_cache._caches.add(broken)
+        logging.disable(logging.CRITICAL)
+        try:
+            invalidate_tables({"users"})
+        finally:
+            logging.disable(logging.NOTSET)
+            result_cache._caches.discard(broken)
+        self.assertIs(cache.get("users"), MISS)
+
+
+class TestSQLiteCache(unittest.TestCase):
+    """Test cases for the shared SQLite-file cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shared_between_instances(self):
+        """A second cache on the same file sees the first one's entries."""
+        SQLiteCache(self.path).set(make_key("SELECT 1"), [(1,)])
+        self.assertEqual(SQLiteCache(self.path).get(make_key("SELECT 1")), [(1,)])
+
+    def test_trim_prunes_table_index(self):
+        """Trimmed entries leave no rows behind in cache_tables."""
+        cache = SQLiteCache(self.path, max_entries=5)
+        for i in range(31):
+            cache.set(i, i, tables={"users", "orders"})
+        self.assertEqual(len(cache), 5)
+        count = sqlite3.connect(self.path).execute("SELECT COUNT(*) FROM cache_tables").fetchone()[0]
+        self.assertEqual(count, 10)
+
+    def test_unrecorded_lookup(self):
+        """get(record=False) does not change the hit and miss counts."""
+        cache = SQLiteCache(self.path)
+        cache.get("a", record=False)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a", record=False), 1)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_invalidate_tables(self):
+        """Invalidation removes the entries and all their index rows."""
+        cache = SQLiteCache(self.path)
+        cache.set("a", 1, tables={"users", "orders"})
+        cache.set("b", 2, tables={"orders"})
+        self.assertEqual(cache.invalidate_tables({"users"}), 1)
+        self.assertIs(cache.get("a"), MISS)
+        self.assertEqual(cache.get("b"), 2)
+
+
+class TestRedisCache(unittest.TestCase):
+    """Test cases for the Redis-protocol cache against the RespServer stand-in."""
+
+    def setUp(self):
+        self.server = RespServer()
+        self.host, self.port = self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_set_get_and_invalidate(self):
+        """Values round-trip and table invalidation drops them."""
+        cache = RedisCache(self.host, self.port, prefix="t1")
+        cache.set("a", {"rows": [1, 2]}, tables={"users"})
+        self.assertEqual(cache.get("a"), {"rows": [1, 2]})
+        cache.invalidate_tables({"users"})
+        self.assertIs(cache.get("a"), MISS)
+
+    def test_table_set_expires(self):
+        """Table sets get a TTL covering their longest-lived member."""
+        cache = RedisCache(self.host, self.port, prefix="t2", ttl=60)
+        cache.set("a", 1, tables={"users"})
+        self.assertGreater(cache.execute("PTTL", "t2:table:users"), 0)
+
+    def test_outage_degrades_to_miss(self):
+        """With the server gone, reads miss and writes are no-ops."""
+        cache = RedisCache(self.host, self.port, prefix="t3")
+        self.server.stop()
+        self.server = RespServer()  # so tearDown has something to stop
+        self.server.start()
+        logging.disable(logging.CRITICAL)
+        try:
+            self.assertIs(cache.get("a"), MISS)
+            cache.set("a", 1, tables={"users"})
+            self.assertEqual(cache.invalidate_tables({"users"}), 0)
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertGreater(cache.errors, 0)
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Callers arriving while a call is in flight get its result."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", load)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("k", load))) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+        self.assertEqual(results, ["value"] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_error_propagates_to_every_waiter(self):
+        """An exception in the shared call is raised in every caller."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def load():
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                flight.do("k", load)
+            except ValueError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=call) for _ in range(2)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+        self.assertEqual(errors, ["boom"] * 3)
+        self.assertEqual(flight.in_flight(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
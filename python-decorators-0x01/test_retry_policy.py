@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Unit tests for the circuit breaker, retry budget and retry_on_failure."""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from retry_policy import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, RetryBudget,
+                          RetryBudgetExhausted, is_lock_error, is_retryable)
+
+retry_on_failure = __import__('3-retry_on_failure').retry_on_failure
+
+LOCKED = sqlite3.OperationalError("database is locked")
+
+
+class FakeClock:
+    """A clock the tests move by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestErrorClassification(unittest.TestCase):
+    """Test cases for is_lock_error and is_retryable."""
+
+    def test_lock_errors_are_retryable(self):
+        """Lock contention is retryable."""
+        self.assertTrue(is_lock_error(LOCKED))
+        self.assertTrue(is_retryable(LOCKED))
+
+    def test_real_failures_are_not_retryable(self):
+        """Syntax errors and missing tables are not retried."""
+        self.assertFalse(is_retryable(sqlite3.OperationalError("no such table: users")))
+        self.assertFalse(is_retryable(sqlite3.IntegrityError("UNIQUE constraint failed")))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker state transitions."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker('test.db', failure_rate=0.5, min_calls=4, window=10.0,
+                                      reset_timeout=5.0, clock=self.clock)
+
+    def open_breaker(self):
+        for _ in range(4):
+            self.breaker.allow()
+            self.breaker.record_failure()
+
+    def test_stays_closed_below_min_calls(self):
+        """A few failures do not open the breaker."""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_stays_closed_below_failure_rate(self):
+        """Failures under failure_rate of the calls keep it closed."""
+        for _ in range(3):
+            self.breaker.record_success()
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_opens_and_rejects(self):
+        """Past the failure rate the breaker opens and fails fast."""
+        self.open_breaker()
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+        self.assertEqual(self.breaker.rejected, 1)
+
+    def test_half_open_success_closes(self):
+        """After reset_timeout one trial call is let through; success closes."""
+        self.open_breaker()
+        self.clock.now += 5.0
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.allow()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.transitions,
+                         {'closed->open': 1, 'open->half_open': 1, 'half_open->closed': 1})
+
+    def test_half_open_failure_reopens(self):
+        """A failed trial call opens the breaker for another reset_timeout."""
+        self.open_breaker()
+        self.clock.now += 5.0
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now += 4.0
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+
+    def test_release_returns_trial_slot(self):
+        """A trial call that ended without an outcome does not lock the breaker half-open."""
+        self.open_breaker()
+        self.clock.now += 5.0
+        self.breaker.allow()
+        self.breaker.release()
+        self.breaker.allow()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_old_failures_leave_the_window(self):
+        """Failures older than the window no longer count."""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now += 11.0
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_listeners_see_transitions(self):
+        """Listeners are called with the old and new state."""
+        changes = []
+        self.breaker.listeners.append(lambda breaker, old, new: changes.append((old, new)))
+        self.open_breaker()
+        self.assertEqual(changes, [(CLOSED, OPEN)])
+
+
+class TestRetryBudget(unittest.TestCase):
+    """Test cases for RetryBudget."""
+
+    def test_min_retries_then_ratio(self):
+        """Retries are capped at min_retries plus ratio of the calls."""
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.5, min_retries=2, clock=clock)
+        for _ in range(4):
+            budget.record_call()
+        self.assertEqual([budget.try_spend() for _ in range(5)], [True, True, True, True, False])
+        self.assertEqual(budget.exhausted, 1)
+
+    def test_budget_refills_after_window(self):
+        """Spent retries leave the window and the budget is available again."""
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0, min_retries=1, window=10.0, clock=clock)
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        clock.now += 11.0
+        self.assertTrue(budget.try_spend())
+
+
+class TestRetryOnFailure(unittest.TestCase):
+    """Test cases for the retry_on_failure decorator."""
+
+    def failing(self, errors, **options):
+        """A decorated function raising errors in turn, then returning 'ok'."""
+        errors = list(errors)
+        options.setdefault('sleep', self.sleeps.append)
+        options.setdefault('budget', None)
+
+        @retry_on_failure(**options)
+        def func():
+            if errors:
+                raise errors.pop(0)
+            return 'ok'
+        return func
+
+    def setUp(self):
+        self.sleeps = []
+
+    def test_retries_until_success(self):
+        """Retryable errors are retried and the result returned."""
+        func = self.failing([LOCKED, LOCKED], retries=3, delay=0.1)
+        self.assertEqual(func(), 'ok')
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertEqual(func.retry_stats.as_dict()['attempts'], {3: 1})
+
+    def test_gives_up_after_retries(self):
+        """The last error is raised once retries are used up."""
+        func = self.failing([LOCKED] * 3, retries=3, delay=0.1)
+        with self.assertRaises(sqlite3.OperationalError):
+            func()
+        self.assertEqual(func.retry_stats.failures, 1)
+
+    def test_real_failure_is_not_retried(self):
+        """Non-retryable errors are raised on the first attempt."""
+        func = self.failing([sqlite3.OperationalError("no such table: users")], retries=3)
+        with self.assertRaises(sqlite3.OperationalError):
+            func()
+        self.assertEqual(self.sleeps, [])
+
+    def test_deadline(self):
+        """No retry starts once the deadline has passed."""
+        now = [0.0]
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            now[0] += seconds
+
+        func = self.failing([LOCKED] * 1000, retries=1000, delay=1, max_delay=1, deadline=2.5,
+                            sleep=sleep, clock=lambda: now[0])
+        with self.assertRaises(sqlite3.OperationalError):
+            func()
+        self.assertLessEqual(sum(self.sleeps), 2.5)
+        self.assertEqual(func.retry_stats.deadline_exceeded, 1)
+
+    def test_budget_exhausted(self):
+        """A spent budget turns the retry into RetryBudgetExhausted."""
+        budget = RetryBudget(ratio=0, min_retries=0)
+        func = self.failing([LOCKED], retries=3, budget=budget)
+        with self.assertRaises(RetryBudgetExhausted):
+            func()
+
+    def test_open_breaker_fails_fast(self):
+        """Repeated lock errors open the breaker and later calls are rejected."""
+        breaker = CircuitBreaker('test.db', min_calls=2, clock=FakeClock())
+        func = self.failing([LOCKED] * 2, retries=2, delay=0.1, breaker=breaker)
+        with self.assertRaises(sqlite3.OperationalError):
+            func()
+        with self.assertRaises(CircuitOpenError):
+            func()
+        self.assertEqual(func.retry_stats.circuit_open, 1)
+
+    def test_caller_errors_do_not_trip_the_breaker(self):
+        """Exceptions that are not database failures count as breaker successes."""
+        breaker = CircuitBreaker('test.db', min_calls=1, clock=FakeClock())
+        func = self.failing([ValueError("bad input")], breaker=breaker)
+        with self.assertRaises(ValueError):
+            func()
+        self.assertEqual(breaker.state, CLOSED)
+
+
+
+class TestBusyWait(unittest.TestCase):
+    """Test cases for retrying lock errors on a real SQLite connection."""
+
+    def setUp(self):
+        """Create a WAL database with one row and two connections to it."""
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "locks.db")
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("CREATE TABLE t (x INTEGER)")
+        self.conn.execute("INSERT INTO t VALUES (0)")
+        self.other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.sleeps = []
+
+    def tearDown(self):
+        self.conn.close()
+        self.other.close()
+        self.tmp.cleanup()
+
+    def value(self):
+        return self.other.execute("SELECT x FROM t").fetchone()[0]
+
+    def test_lock_is_waited_for_by_sqlite(self):
+        """A held write lock is waited out through busy_timeout, without sleeping."""
+        self.conn.execute("PRAGMA busy_timeout = 0")
+        self.other.execute("BEGIN IMMEDIATE")
+        threading.Timer(0.2, lambda: self.other.execute("COMMIT")).start()
+
+        @retry_on_failure(retries=3, delay=2, budget=None, sleep=self.sleeps.append)
+        def write(conn):
+            conn.execute("UPDATE t SET x = x + 1")
+
+        write(self.conn)
+        self.assertEqual(self.value(), 1)
+        self.assertEqual(self.sleeps, [])
+        self.assertEqual(write.retry_stats.lock_errors, 1)
+        self.assertEqual(self.conn.execute("PRAGMA busy_timeout").fetchone()[0], 0)
+
+    def test_lock_error_without_busy_wait_backs_off(self):
+        """A lock error returned at once (busy handler skipped) is slept on, not retried back-to-back."""
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        errors = [LOCKED, LOCKED]
+
+        @retry_on_failure(retries=3, delay=0.01, budget=None, sleep=self.sleeps.append)
+        def write(conn):
+            if errors:
+                raise errors.pop(0)
+            return 'ok'
+
+        self.assertEqual(write(self.conn), 'ok')
+        self.assertEqual(len(self.sleeps), 2)
+
+    def test_stale_snapshot_is_rolled_back_and_retried(self):
+        """A WAL read-then-write that lost its snapshot starts over in a new transaction."""
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        attempts = []
+
+        @retry_on_failure(retries=3, delay=0.01, budget=None, sleep=self.sleeps.append)
+        def increment(conn):
+            attempts.append(time.monotonic())
+            conn.execute("BEGIN")
+            (value,) = conn.execute("SELECT x FROM t").fetchone()
+            if len(attempts) == 1:
+                # Another writer commits after our snapshot was taken
+                self.other.execute("UPDATE t SET x = x + 100")
+            conn.execute("UPDATE t SET x = ?", (value + 1,))
+            conn.execute("COMMIT")
+
+        increment(self.conn)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(self.value(), 101)
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertFalse(self.conn.in_transaction)
+
+    def test_caller_transaction_is_left_alone(self):
+        """Inside a transaction the caller opened, failed attempts are not rolled back."""
+        self.conn.execute("BEGIN")
+        self.conn.execute("UPDATE t SET x = 5")
+        errors = [LOCKED]
+
+        @retry_on_failure(retries=2, delay=0.01, budget=None, sleep=self.sleeps.append)
+        def step(conn):
+            if errors:
+                raise errors.pop(0)
+
+        step(self.conn)
+        self.assertTrue(self.conn.in_transaction)
+        self.assertEqual(len(self.sleeps), 1)
+        self.conn.execute("COMMIT")
+        self.assertEqual(self.value(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Unit tests for nested transactional calls."""
+import os
+import sqlite3
+import tempfile
+import unittest
+from result_cache import MISS, QueryCache
+
+transactional = __import__('2-transactional').transactional
+
+
+@transactional
+def add_user(conn, user_id, name):
+    conn.execute("INSERT INTO users (id, name) VALUES (?, ?)", (user_id, name))
+
+
+@transactional
+def add_user_and_fail(conn, user_id, name):
+    add_user(conn, user_id, name)
+    raise ValueError(name)
+
+
+@transactional
+def add_users(conn, users, failing=()):
+    for user_id, name in users:
+        if user_id in failing:
+            try:
+                add_user_and_fail(conn, user_id, name)
+            except ValueError:
+                pass
+        else:
+            add_user(conn, user_id, name)
+
+
+class TestTransactional(unittest.TestCase):
+    """Test cases for transactional and its savepoint nesting."""
+
+    def setUp(self):
+        """Create a scratch users table."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "users.db")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def committed(self):
+        """Names visible to a separate connection, i.e. committed."""
+        conn = sqlite3.connect(self.path)
+        try:
+            return [row[0] for row in conn.execute("SELECT name FROM users ORDER BY id")]
+        finally:
+            conn.close()
+
+    def test_commit_on_success(self):
+        """A successful call is committed."""
+        add_user(self.conn, 1, 'Alice')
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self.committed(), ['Alice'])
+
+    def test_rollback_on_error(self):
+        """A failing call is rolled back and the error re-raised."""
+        with self.assertRaises(ValueError):
+            add_user_and_fail(self.conn, 1, 'Alice')
+        self.assertEqual(self.committed(), [])
+
+    def test_nested_failure_rolls_back_to_savepoint(self):
+        """A failed nested call undoes only its own writes."""
+        add_users(self.conn, [(1, 'Alice'), (2, 'Bob'), (3, 'Carol')], failing={2})
+        self.assertEqual(self.committed(), ['Alice', 'Carol'])
+
+    def test_outer_failure_rolls_back_nested_work(self):
+        """Released savepoints are still undone when the outer call fails."""
+        @transactional
+        def outer(conn):
+            add_user(conn, 1, 'Alice')
+            raise ValueError('outer')
+
+        with self.assertRaises(ValueError):
+            outer(self.conn)
+        self.assertEqual(self.committed(), [])
+
+    def test_only_outermost_call_commits(self):
+        """Nested calls do not commit; the data appears when the outer call returns."""
+        seen = []
+
+        @transactional
+        def outer(conn):
+            add_user(conn, 1, 'Alice')
+            seen.append(self.committed())
+
+        outer(self.conn)
+        self.assertEqual(seen, [[]])
+        self.assertEqual(self.committed(), ['Alice'])
+
+    def test_open_transaction_is_treated_as_nested(self):
+        """Called inside a transaction the caller opened, the call leaves committing to the caller."""
+        self.conn.execute("BEGIN")
+        add_user(self.conn, 1, 'Alice')
+        self.assertTrue(self.conn.in_transaction)
+        self.conn.rollback()
+        self.assertEqual(self.committed(), [])
+
+    def test_cache_invalidated_after_commit(self):
+        """Cached results that read a written table are dropped after the commit."""
+        cache = QueryCache()
+        cache.set('users', [], tables={'users'})
+        add_user(self.conn, 1, 'Alice')
+        self.assertIs(cache.get('users'), MISS)
+
+
+if __name__ == "__main__":
+    unittest.main()
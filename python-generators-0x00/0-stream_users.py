@@ -1,5 +1,6 @@
 import mysql.connector
 from mysql.connector import Error
+from records import SELECT_USERS, check_row_format, convert_row
 
 def connect_to_prodev():
     """Connect to the ALX_prodev database."""
@@ -17,22 +18,48 @@ def connect_to_prodev():
         print(f"Error connecting to ALX_prodev: {e}")
         return None
 
-def stream_users():
-    """Generator to stream rows from user_data table one by one."""
+def stream_users(prefetch_size=None, row_format='dict'):
+    """Generator to stream rows from user_data table one by one.
+
+    Passing prefetch_size switches to streaming mode: the query runs on an
+    unbuffered (server-side) cursor and at most prefetch_size rows are pulled
+    from the server at a time, so time-to-first-row and client memory stay
+    constant however large the table is.
+
+    row_format selects the row type: 'dict' (default), or the compact
+    'slots' (UserRecord) and 'tuple' (UserTuple) records from records.py.
+    """
+    check_row_format(row_format, ('dict', 'slots', 'tuple'))
+    as_dict = row_format == 'dict'
+    query = "SELECT * FROM user_data" if as_dict else SELECT_USERS
+
     connection = connect_to_prodev()
     if not connection:
         return
 
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
-        # Single loop to yield each row
-        for row in cursor:
-            yield row
+        if prefetch_size:
+            cursor = connection.cursor(dictionary=as_dict, buffered=False)
+            cursor.execute(query)
+            # Pull a bounded window of rows at a time and yield them one by one
+            while True:
+                rows = cursor.fetchmany(prefetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row if as_dict else convert_row(row, row_format)
+        else:
+            cursor = connection.cursor(dictionary=as_dict)
+            cursor.execute(query)
+            # Single loop to yield each row
+            for row in cursor:
+                yield row if as_dict else convert_row(row, row_format)
         cursor.close()
-        connection.close()
     except Error as e:
         print(f"Error streaming rows: {e}")
+    finally:
+        # Also runs when the consumer stops early; closing the connection
+        # discards any rows the unbuffered cursor has not read yet.
         if connection.is_connected():
             connection.close()
 
@@ -1,6 +1,10 @@
 
+import queue
+import threading
 import mysql.connector
 from mysql.connector import Error
+from predicates import col, plan
+from records import SELECT_USERS, check_row_format, convert_batch
 
 def connect_to_prodev():
     """Connect to the ALX_prodev database."""
@@ -18,35 +22,118 @@ def connect_to_prodev():
         print(f"Error connecting to ALX_prodev: {e}")
         return None
 
-def stream_users_in_batches(batch_size):
-    """Generator to fetch rows from user_data table in batches."""
+_END = object()
+
+def prefetch(iterable, depth):
+    """Generator that reads up to depth items of iterable ahead on a background thread.
+
+    Producing the next items (e.g. fetching batches from the database)
+    overlaps with the consumer's work on the current one. Exceptions raised
+    by the producer are re-raised in the consumer, and closing this
+    generator stops the producer and closes the underlying iterable.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Block while the buffer is full, but give up once the consumer is gone
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        source = iter(iterable)
+        try:
+            for item in source:
+                if not put((item, None)):
+                    break
+            else:
+                put((_END, None))
+        except BaseException as e:
+            put((_END, e))
+        finally:
+            close = getattr(source, 'close', None)
+            if close:
+                close()
+
+    producer = threading.Thread(target=produce, name="batch-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _END:
+                break
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+def stream_users_in_batches(batch_size, prefetch_depth=0, where=None, params=(), row_format='dict'):
+    """Generator to fetch rows from user_data table in batches.
+
+    With prefetch_depth > 0, up to that many batches are fetched ahead on a
+    background thread while the caller processes the current batch. where is
+    an optional parameterized SQL condition (with params) applied on the
+    server, e.g. from predicates.plan(). row_format is 'dict' (default),
+    'slots', 'tuple' (lists of compact records) or 'batch' (one columnar
+    UserBatch per batch); see records.py. Connection and query errors are
+    raised, so a failed stream is never mistaken for the end of the table.
+    """
+    check_row_format(row_format)
+    if prefetch_depth > 0:
+        source = stream_users_in_batches(batch_size, where=where, params=params, row_format=row_format)
+        yield from prefetch(source, prefetch_depth)
+        return
+    as_dict = row_format == 'dict'
+
     connection = connect_to_prodev()
     if not connection:
-        return
+        raise ConnectionError("Could not connect to ALX_prodev")
 
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
+        cursor = connection.cursor(dictionary=as_dict)
+        query = "SELECT * FROM user_data" if as_dict else SELECT_USERS
+        if where:
+            query += f" WHERE {where}"
+        cursor.execute(query, tuple(params))
         
         # Loop 1: Fetch rows in batches
         while True:
             batch = cursor.fetchmany(batch_size)
             if not batch:
                 break
-            yield batch
+            yield batch if as_dict else convert_batch(batch, row_format)
         cursor.close()
-        connection.close()
     except Error as e:
         print(f"Error streaming batches: {e}")
+        raise
+    finally:
         if connection.is_connected():
             connection.close()
 
-def batch_processing(batch_size):
-    """Process batches to filter users over age 25."""
+def batch_processing(batch_size, prefetch_depth=0, predicate=None):
+    """Process batches to filter users matching predicate (default: over age 25).
+
+    The predicate is compiled to a WHERE clause where possible so that only
+    matching rows cross the wire; parts that cannot be expressed in SQL are
+    evaluated on each batch client-side.
+    """
+    if predicate is None:
+        predicate = col('age') > 25
+    where, params, residual = plan(predicate)
     # Loop 2: Iterate over batches from generator
-    for batch in stream_users_in_batches(batch_size):
+    for batch in stream_users_in_batches(batch_size, prefetch_depth, where, params):
         # Loop 3: Filter users in the batch
-        filtered_users = [user for user in batch if user['age'] > 25]
+        if residual is None:
+            filtered_users = batch
+        else:
+            filtered_users = [user for user in batch if residual(user)]
         yield filtered_users
 
 def main():
@@ -1,4 +1,6 @@
 
+import base64
+import json
 import mysql.connector
 from mysql.connector import Error
 
@@ -18,11 +20,17 @@ def connect_to_prodev():
         print(f"Error connecting to ALX_prodev: {e}")
         return None
 
-def paginate_users(page_size, offset):
-    """Fetch a specific page of users from user_data table."""
-    connection = connect_to_prodev()
-    if not connection:
-        return []
+def paginate_users(page_size, offset, connection=None):
+    """Fetch a specific page of users from user_data table.
+
+    If connection is given it is used as-is and left open for the caller;
+    otherwise a connection is opened and closed just for this page.
+    """
+    own_connection = connection is None
+    if own_connection:
+        connection = connect_to_prodev()
+        if not connection:
+            return []
 
     try:
         cursor = connection.cursor(dictionary=True)
@@ -30,24 +38,98 @@ def paginate_users(page_size, offset):
         cursor.execute(query, (page_size, offset))
         rows = cursor.fetchall()
         cursor.close()
-        connection.close()
         return rows
     except Error as e:
         print(f"Error fetching page: {e}")
-        if connection.is_connected():
-            connection.close()
         return []
+    finally:
+        if own_connection and connection.is_connected():
+            connection.close()
+
+def paginate_users_after(page_size, last_user_id=None, connection=None):
+    """Fetch the page of users that follows last_user_id in user_id order.
+
+    Keyset (seek) pagination: the primary key index is used to jump straight
+    to the first row after last_user_id, so every page costs the same no
+    matter how deep into the table it is. connection is handled as in
+    paginate_users. Database errors are raised rather than returned as an
+    empty page.
+    """
+    own_connection = connection is None
+    if own_connection:
+        connection = connect_to_prodev()
+        if not connection:
+            raise ConnectionError("Could not connect to ALX_prodev")
+
+    try:
+        cursor = connection.cursor(dictionary=True)
+        if last_user_id is None:
+            query = "SELECT * FROM user_data ORDER BY user_id LIMIT %s"
+            cursor.execute(query, (page_size,))
+        else:
+            query = "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s"
+            cursor.execute(query, (last_user_id, page_size))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    except Error as e:
+        # An empty page would read as the end of the table; let the caller resume instead
+        print(f"Error fetching page: {e}")
+        raise
+    finally:
+        if own_connection and connection.is_connected():
+            connection.close()
+
+def encode_cursor(page):
+    """Return an opaque resume cursor pointing just after the last row of page."""
+    token = json.dumps({"after": page[-1]['user_id']}).encode('utf-8')
+    return base64.urlsafe_b64encode(token).decode('ascii')
+
+def decode_cursor(resume_cursor):
+    """Return the last seen user_id stored in a resume cursor (None for a fresh start)."""
+    if not resume_cursor:
+        return None
+    try:
+        token = base64.urlsafe_b64decode(resume_cursor.encode('ascii'))
+        return json.loads(token)["after"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid resume cursor: {resume_cursor!r}") from e
 
-def lazy_paginate(page_size):
-    """Generator to lazily load pages of users starting at offset 0."""
-    offset = 0
-    # Single loop to fetch pages
-    while True:
-        page = paginate_users(page_size, offset)
-        if not page:  # No more data to fetch
-            break
-        yield page
-        offset += page_size
+def lazy_paginate(page_size, resume_cursor=None, connection=None):
+    """Generator to lazily load pages of users in user_id order.
+
+    Pages are fetched with keyset pagination. Pass encode_cursor(page) of the
+    last page that was fully processed as resume_cursor to pick up a crashed
+    walk right after it.
+
+    All pages are read over a single connection. Pass connection to borrow
+    one (e.g. from a pool) that the caller keeps ownership of; otherwise one
+    is opened for the walk and closed as soon as the generator finishes, is
+    closed, or is garbage-collected.
+
+    A failed connection or query raises, so an interrupted walk is never
+    mistaken for the end of the table.
+    """
+    last_user_id = decode_cursor(resume_cursor)
+    own_connection = connection is None
+    if own_connection:
+        connection = connect_to_prodev()
+        if not connection:
+            raise ConnectionError("Could not connect to ALX_prodev")
+
+    try:
+        # Single loop to fetch pages
+        while True:
+            page = paginate_users_after(page_size, last_user_id, connection=connection)
+            if not page:  # No more data to fetch
+                break
+            yield page
+            if len(page) < page_size:  # A short page is the last one
+                break
+            last_user_id = page[-1]['user_id']
+    finally:
+        if own_connection and connection.is_connected():
+            connection.close()
 
 def main():
     page_size = 2  # Example page size
@@ -55,6 +137,7 @@ def main():
     # Iterate over pages
     for page in lazy_paginate(page_size):
         print("Page:", page)
+        print("Resume cursor:", encode_cursor(page))
 
 if __name__ == "__main__":
     main()
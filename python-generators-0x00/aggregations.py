@@ -0,0 +1,208 @@
+"""Aggregations over user_data ages without a per-row Python loop.
+
+Two paths are provided:
+
+* push_down_age_stats() lets MySQL compute COUNT/AVG/MIN/MAX (and
+  nearest-rank percentiles) so only a handful of values cross the wire.
+* client_age_stats() streams ages in chunks and folds each chunk into an
+  AgeStats accumulator. With NumPy installed every chunk is processed
+  vectorized; without it a pure-Python fallback is used.
+
+AgeStats merges chunk results with the parallel form of Welford's algorithm
+(Chan et al.) and keeps a Kahan-compensated running sum, so mean and
+variance stay accurate over very long streams.
+"""
+import bisect
+import math
+from mysql.connector import Error
+from seed import connect_to_prodev
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; AgeStats falls back to pure Python
+    np = None
+
+def push_down_age_stats(connection=None, percentiles=()):
+    """Compute count, average, min, max and percentiles of age inside MySQL.
+
+    percentiles are fractions in [0, 1] resolved with the nearest-rank
+    method, one ORDER BY ... LIMIT 1 OFFSET query each.
+    """
+    own_connection = connection is None
+    if own_connection:
+        connection = connect_to_prodev()
+        if not connection:
+            return None
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(age), AVG(age), MIN(age), MAX(age) FROM user_data")
+        count, avg, minimum, maximum = cursor.fetchone()
+        stats = {
+            'count': count,
+            'mean': float(avg) if avg is not None else 0.0,
+            'min': float(minimum) if minimum is not None else None,
+            'max': float(maximum) if maximum is not None else None,
+            'percentiles': {},
+        }
+        for fraction in percentiles:
+            if not count:
+                break
+            rank = max(math.ceil(fraction * count), 1)
+            cursor.execute("SELECT age FROM user_data ORDER BY age LIMIT 1 OFFSET %s", (rank - 1,))
+            stats['percentiles'][fraction] = float(cursor.fetchone()[0])
+        cursor.close()
+        return stats
+    except Error as e:
+        print(f"Error aggregating ages: {e}")
+        return None
+    finally:
+        if own_connection and connection.is_connected():
+            connection.close()
+
+class AgeStats:
+    """One-pass, mergeable accumulator for count, sum, mean, variance, min, max and a histogram."""
+
+    def __init__(self, bins=None):
+        """bins is an optional ascending list of histogram edges."""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._sum = 0.0
+        self._compensation = 0.0
+        self.bins = list(bins) if bins is not None else None
+        self.histogram = [0] * (len(self.bins) - 1) if self.bins else None
+
+    @property
+    def sum(self):
+        """Kahan-compensated total of all values."""
+        return self._sum + self._compensation
+
+    @property
+    def variance(self):
+        """Population variance."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def sample_variance(self):
+        """Unbiased sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def _add_to_sum(self, value):
+        # Kahan-Babuska (Neumaier) summation of per-chunk totals
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - total) + value
+        else:
+            self._compensation += (value - total) + self._sum
+        self._sum = total
+
+    def _combine(self, count, mean, m2, total, minimum, maximum):
+        """Fold the moments of another group of values into this one (Chan et al.)."""
+        if count == 0:
+            return
+        combined = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / combined
+        self.m2 += m2 + delta * delta * self.count * count / combined
+        self.count = combined
+        self._add_to_sum(total)
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def update(self, values):
+        """Fold a chunk of values (a sequence or NumPy array) into the statistics."""
+        if np is not None:
+            chunk = np.asarray(values, dtype=np.float64).reshape(-1)
+            if chunk.size == 0:
+                return
+            chunk_mean = float(chunk.mean())
+            chunk_m2 = float(np.square(chunk - chunk_mean).sum())
+            self._combine(chunk.size, chunk_mean, chunk_m2, float(chunk.sum()),
+                          float(chunk.min()), float(chunk.max()))
+            if self.histogram is not None:
+                counts, _ = np.histogram(chunk, bins=self.bins)
+                self.histogram = [a + int(b) for a, b in zip(self.histogram, counts)]
+            return
+
+        chunk = [float(value) for value in values]
+        if not chunk:
+            return
+        total = math.fsum(chunk)
+        chunk_mean = total / len(chunk)
+        chunk_m2 = math.fsum((value - chunk_mean) ** 2 for value in chunk)
+        self._combine(len(chunk), chunk_mean, chunk_m2, total, min(chunk), max(chunk))
+        if self.histogram is not None:
+            last = len(self.bins) - 1
+            for value in chunk:
+                # Same convention as numpy.histogram: the last bin is closed
+                if value == self.bins[-1]:
+                    self.histogram[-1] += 1
+                    continue
+                index = bisect.bisect_right(self.bins, value) - 1
+                if 0 <= index < last:
+                    self.histogram[index] += 1
+
+    def merge(self, other):
+        """Fold another AgeStats (e.g. from a different partition) into this one."""
+        self._combine(other.count, other.mean, other.m2, other.sum, other.min, other.max)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        return self
+
+    def as_dict(self):
+        """Return the statistics as a plain dict."""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.mean,
+            'variance': self.variance,
+            'stddev': math.sqrt(self.variance),
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'bins': self.bins,
+            'histogram': self.histogram,
+        }
+
+def stream_age_chunks(chunk_size=10000, connection=None):
+    """Generator to yield ages in chunks (NumPy arrays when available, else lists)."""
+    own_connection = connection is None
+    if own_connection:
+        connection = connect_to_prodev()
+        if not connection:
+            return
+
+    try:
+        cursor = connection.cursor()
+        # age + 0E0 makes MySQL return doubles instead of Decimal objects
+        cursor.execute("SELECT age + 0E0 FROM user_data")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if np is not None:
+                yield np.array(rows, dtype=np.float64).reshape(-1)
+            else:
+                yield [age for (age,) in rows]
+        cursor.close()
+    except Error as e:
+        print(f"Error streaming ages: {e}")
+    finally:
+        if own_connection and connection.is_connected():
+            connection.close()
+
+def client_age_stats(chunk_size=10000, bins=None, connection=None):
+    """Compute mean, variance, min, max and an optional histogram of age in one pass."""
+    stats = AgeStats(bins=bins)
+    for chunk in stream_age_chunks(chunk_size, connection):
+        stats.update(chunk)
+    return stats
+
+def main():
+    print("Database-side:", push_down_age_stats(percentiles=(0.5, 0.95, 0.99)))
+    print("Client-side:", client_age_stats(bins=range(0, 121, 10)).as_dict())
+
+if __name__ == "__main__":
+    main()
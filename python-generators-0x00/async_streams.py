@@ -0,0 +1,161 @@
+"""Async (async for) equivalents of the python-generators-0x00 streamers.
+
+Built on aiomysql so they can be served from an asyncio web stack without
+tying up threads. Each generator reads through an unbuffered server-side
+cursor in bounded fetchmany windows and only fetches when the consumer asks
+for more, so a slow consumer naturally applies backpressure. Cancelling the
+consuming task (or calling aclose()) closes the connection, discarding any
+unread rows instead of draining them.
+
+fan_out() runs several independent streams concurrently on one event loop.
+"""
+import asyncio
+import aiomysql
+
+DB_CONFIG = {
+    'host': "localhost",
+    'user': "sammking",  # Replace with your MySQL username
+    'password': "passdem",  # Replace with your MySQL password
+    'db': "ALX_prodev",
+}
+
+async def connect_to_prodev():
+    """Open an async connection to the ALX_prodev database."""
+    try:
+        connection = await aiomysql.connect(**DB_CONFIG)
+        print("Successfully connected to ALX_prodev database")
+        return connection
+    except aiomysql.Error as e:
+        print(f"Error connecting to ALX_prodev: {e}")
+        return None
+
+async def _stream_query(query, params=(), fetch_size=100, cursor_class=aiomysql.SSDictCursor):
+    """Async generator to yield lists of at most fetch_size rows of a query."""
+    connection = await connect_to_prodev()
+    if not connection:
+        return
+
+    try:
+        cursor = await connection.cursor(cursor_class)
+        await cursor.execute(query, params)
+        while True:
+            rows = await cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+        await cursor.close()
+    except aiomysql.Error as e:
+        print(f"Error streaming rows: {e}")
+    finally:
+        # Closing the socket (rather than the unbuffered cursor) avoids
+        # reading the rest of the result set when the stream stops early.
+        connection.close()
+
+async def stream_users(prefetch_size=100):
+    """Async generator to stream rows from user_data table one by one."""
+    async for rows in _stream_query("SELECT * FROM user_data", fetch_size=prefetch_size):
+        for row in rows:
+            yield row
+
+async def stream_users_in_batches(batch_size):
+    """Async generator to fetch rows from user_data table in batches."""
+    async for batch in _stream_query("SELECT * FROM user_data", fetch_size=batch_size):
+        yield batch
+
+async def stream_user_ages(prefetch_size=1000):
+    """Async generator to yield user ages one by one as floats."""
+    query = "SELECT age FROM user_data"
+    async for rows in _stream_query(query, fetch_size=prefetch_size, cursor_class=aiomysql.SSCursor):
+        for (age,) in rows:
+            yield float(age)
+
+async def lazy_paginate(page_size, resume_cursor=None):
+    """Async generator to lazily load keyset-paginated pages of users over one connection.
+
+    Resume cursors are the same as those of 2-lazy_paginate.encode_cursor().
+    Errors are raised, so an interrupted walk is never mistaken for the end.
+    """
+    decode_cursor = __import__('2-lazy_paginate').decode_cursor
+    last_user_id = decode_cursor(resume_cursor)
+    connection = await connect_to_prodev()
+    if not connection:
+        raise ConnectionError("Could not connect to ALX_prodev")
+
+    try:
+        cursor = await connection.cursor(aiomysql.DictCursor)
+        while True:
+            if last_user_id is None:
+                await cursor.execute("SELECT * FROM user_data ORDER BY user_id LIMIT %s", (page_size,))
+            else:
+                await cursor.execute(
+                    "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                    (last_user_id, page_size),
+                )
+            page = await cursor.fetchall()
+            if not page:
+                break
+            yield list(page)
+            if len(page) < page_size:
+                break
+            last_user_id = page[-1]['user_id']
+        await cursor.close()
+    except aiomysql.Error as e:
+        print(f"Error fetching page: {e}")
+        raise
+    finally:
+        connection.close()
+
+async def fan_out(*streams, buffer_size=100):
+    """Async generator to consume several async iterables concurrently.
+
+    Yields (stream_index, item) pairs as items arrive. At most buffer_size
+    items are buffered in total; producers wait when the buffer is full.
+    The first exception raised by any stream is re-raised here. Closing the
+    generator (e.g. leaving an "async with contextlib.aclosing(...)" block
+    early) cancels and closes every stream.
+    """
+    queue = asyncio.Queue(maxsize=buffer_size)
+    finished = object()
+
+    async def pump(index, stream):
+        try:
+            async for item in stream:
+                await queue.put((index, item, None))
+            await queue.put((index, finished, None))
+        except Exception as e:
+            await queue.put((index, finished, e))
+        finally:
+            aclose = getattr(stream, 'aclose', None)
+            if aclose:
+                await aclose()
+
+    tasks = [asyncio.create_task(pump(index, stream)) for index, stream in enumerate(streams)]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            index, item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is finished:
+                remaining -= 1
+                continue
+            yield index, item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def main():
+    """Stream users and ages side by side on one event loop."""
+    total_age = 0.0
+    count = 0
+    async for index, item in fan_out(stream_users(), stream_user_ages()):
+        if index == 0:
+            print(item)
+        else:
+            total_age += item
+            count += 1
+    print(f"Average age of users: {total_age / count if count else 0.0:.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,355 @@
+"""Reproducible benchmark of the python-generators-0x00 streaming strategies.
+
+Seeds a synthetic user_data table (deterministic rows from a fixed random
+seed) at each requested size into a local SQLite stand-in, or into a
+scratch ALX_prodev_bench MySQL database with --backend mysql, then drains
+the real generators of 0-stream_users, 1-batch_processing, 2-lazy_paginate
+and 4-stream_ages with their connect_to_prodev pointed at that database
+(so mysql-connector must be importable even for the SQLite stand-in):
+
+* stream_users[_prefetch|_tuple]     - row by row; buffered, or unbuffered
+                                       fetchmany windows, as dicts or tuples
+* stream_users_in_batches[_prefetch|_columnar]
+                                     - fetchmany(batch_size), optionally
+                                       prefetched or as UserBatch columns
+* batch_processing                   - batches filtered by pushed-down age > 25
+* lazy_paginate_offset               - LIMIT/OFFSET pages over one connection
+* lazy_paginate_keyset               - lazy_paginate's WHERE user_id > ? pages
+* stream_user_ages                   - SELECT age, row by row as floats
+
+For each strategy and batch size it reports rows/sec, time-to-first-row,
+peak traced memory, DB round trips (queries sent; a result set streams
+back in one response however it is fetched) and driver fetch calls
+(one per fetchmany/fetchall batch, one per row for fetchone or iterating
+a cursor), and writes everything as JSON so results can be diffed between
+releases:
+
+    python benchmark.py --sizes 10000 1000000 --batch-sizes 100 1000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+SEED = 1234
+FIRST_NAMES = ("Johnnie", "Myrtle", "Flora", "Dan", "Glenda", "Ross", "Edmund", "Alma")
+LAST_NAMES = ("Mayer", "Waters", "Ortiz", "Funk", "Reynolds", "Kuhn", "Lind", "Bauch")
+
+class CountingCursor:
+    """Cursor wrapper that counts the round trips and fetch calls a generator makes.
+
+    Every execute is a round trip. Fetches are not: they read the rows of
+    the result the server already sent, so they are counted separately, a
+    fetchmany/fetchall batch as one call and fetchone (or iterating the
+    cursor) as one call per row. Backends without dictionary cursors get
+    their rows turned into dicts here.
+    """
+
+    def __init__(self, cursor, counter, backend, dictionary):
+        self.cursor = cursor
+        self.counter = counter
+        self.backend = backend
+        self.as_dicts = dictionary and not backend.dictionary_cursors
+
+    def _row(self, row):
+        if row is None or not self.as_dicts:
+            return row
+        return dict(zip([column[0] for column in self.cursor.description], row))
+
+    def execute(self, query, params=()):
+        self.counter['round_trips'] += 1
+        return self.cursor.execute(self.backend.sql(query), tuple(params))
+
+    def fetchone(self):
+        self.counter['fetch_calls'] += 1
+        return self._row(self.cursor.fetchone())
+
+    def fetchmany(self, size):
+        self.counter['fetch_calls'] += 1
+        return [self._row(row) for row in self.cursor.fetchmany(size)]
+
+    def fetchall(self):
+        self.counter['fetch_calls'] += 1
+        return [self._row(row) for row in self.cursor.fetchall()]
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self.cursor.close()
+
+class CountingConnection:
+    """Stands in for the connection returned by connect_to_prodev, on the benchmark backend."""
+
+    def __init__(self, backend, counter):
+        self.backend = backend
+        self.counter = counter
+        self.connection = backend.connect()
+        self.open = True
+
+    def cursor(self, dictionary=False, buffered=None):
+        raw = self.backend.cursor(self.connection, dictionary, buffered)
+        return CountingCursor(raw, self.counter, self.backend, dictionary)
+
+    def commit(self):
+        self.connection.commit()
+
+    def is_connected(self):
+        return self.open
+
+    def close(self):
+        if self.open:
+            self.connection.close()
+            self.open = False
+
+class Backend:
+    """A database stand-in exposing connections and its SQL placeholder style."""
+
+    placeholder = '?'
+    dictionary_cursors = False
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def cursor(self, connection, dictionary, buffered):
+        return connection.cursor()
+
+    def sql(self, query):
+        return query.replace('%s', self.placeholder)
+
+    def create_table(self, connection):
+        connection.execute("DROP TABLE IF EXISTS user_data")
+        connection.execute("""
+        CREATE TABLE user_data (
+            user_id CHAR(36) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) NOT NULL,
+            age DECIMAL(5,2) NOT NULL
+        )
+        """)
+        connection.commit()
+
+class MySQLBackend(Backend):
+    """Benchmark on the local MySQL server, in a scratch database so ALX_prodev is untouched."""
+
+    placeholder = '%s'
+    dictionary_cursors = True
+    database = "ALX_prodev_bench"
+
+    def __init__(self):
+        super().__init__(None)
+        from seed import connect_db
+        self._connect = connect_db
+
+    def connect(self):
+        connection = self._connect()
+        if not connection:
+            raise RuntimeError("Could not connect to the MySQL server")
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+        cursor.execute(f"USE {self.database}")
+        cursor.close()
+        return connection
+
+    def cursor(self, connection, dictionary, buffered):
+        return connection.cursor(dictionary=dictionary, buffered=buffered)
+
+    def create_table(self, connection):
+        cursor = connection.cursor()
+        cursor.execute("DROP TABLE IF EXISTS user_data")
+        cursor.close()
+        from seed import create_table
+        create_table(connection)
+
+def synthetic_rows(count, seed=SEED):
+    """Generator of deterministic (user_id, name, email, age) rows."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield (
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            f"{first} {last}",
+            f"{first}.{last}{rng.randrange(100)}@example.com",
+            rng.randrange(18, 100),
+        )
+
+def seed_table(backend, count, chunk_size=10000):
+    """(Re)create user_data on backend with count synthetic rows."""
+    connection = backend.connect()
+    backend.create_table(connection)
+    cursor = connection.cursor()
+    insert = backend.sql("INSERT INTO user_data (user_id, name, email, age) VALUES (%s, %s, %s, %s)")
+    chunk = []
+    for row in synthetic_rows(count):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            cursor.executemany(insert, chunk)
+            connection.commit()
+            chunk = []
+    if chunk:
+        cursor.executemany(insert, chunk)
+        connection.commit()
+    cursor.close()
+    connection.close()
+
+def offset_pages(module, page_size):
+    """LIMIT/OFFSET walk over one connection with 2-lazy_paginate.paginate_users."""
+    connection = module.connect_to_prodev()
+    try:
+        offset = 0
+        while True:
+            page = module.paginate_users(page_size, offset, connection=connection)
+            if not page:
+                break
+            yield page
+            offset += page_size
+    finally:
+        connection.close()
+
+# name: (module, make(module, batch_size) -> iterable, takes a batch size, yields lists of rows)
+STRATEGIES = {
+    'stream_users': ('0-stream_users', lambda m, size: m.stream_users(), False, False),
+    'stream_users_prefetch': ('0-stream_users', lambda m, size: m.stream_users(prefetch_size=size), True, False),
+    'stream_users_tuple': (
+        '0-stream_users', lambda m, size: m.stream_users(prefetch_size=size, row_format='tuple'), True, False),
+    'stream_users_in_batches': ('1-batch_processing', lambda m, size: m.stream_users_in_batches(size), True, True),
+    'stream_users_in_batches_prefetch': (
+        '1-batch_processing', lambda m, size: m.stream_users_in_batches(size, prefetch_depth=2), True, True),
+    'stream_users_in_batches_columnar': (
+        '1-batch_processing', lambda m, size: m.stream_users_in_batches(size, row_format='batch'), True, True),
+    'batch_processing': ('1-batch_processing', lambda m, size: m.batch_processing(size), True, True),
+    'lazy_paginate_offset': ('2-lazy_paginate', offset_pages, True, True),
+    'lazy_paginate_keyset': ('2-lazy_paginate', lambda m, size: m.lazy_paginate(size), True, True),
+    'stream_user_ages': ('4-stream_ages', lambda m, size: m.stream_user_ages(), False, False),
+}
+
+class patched_connect:
+    """Point a generator module's connect_to_prodev at the benchmark backend while active."""
+
+    def __init__(self, module, backend, counter):
+        self.module = module
+        self.replacement = lambda: CountingConnection(backend, counter)
+
+    def __enter__(self):
+        self.original = self.module.connect_to_prodev
+        self.module.connect_to_prodev = self.replacement
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.module.connect_to_prodev = self.original
+
+def drain(backend, name, batch_size, counter, on_item=None):
+    """Run one strategy of the real generator modules to the end."""
+    module_name, make, _, batched = STRATEGIES[name]
+    module = __import__(module_name)
+    with patched_connect(module, backend, counter):
+        for item in make(module, batch_size):
+            if on_item:
+                on_item(len(item) if batched else 1)
+
+def measure(backend, name, batch_size):
+    """Drain one strategy twice: once for timings, once under tracemalloc for memory."""
+    counter = {'round_trips': 0, 'fetch_calls': 0}
+    totals = {'rows': 0, 'first_row': None}
+    start = time.perf_counter()
+
+    def on_item(rows):
+        if totals['first_row'] is None:
+            totals['first_row'] = time.perf_counter() - start
+        totals['rows'] += rows
+
+    drain(backend, name, batch_size, counter, on_item)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    drain(backend, name, batch_size, {'round_trips': 0, 'fetch_calls': 0})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows, first_row = totals['rows'], totals['first_row']
+    return {
+        'rows': rows,
+        'seconds': round(elapsed, 6),
+        'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else None,
+        'time_to_first_row': round(first_row, 6) if first_row is not None else None,
+        'peak_memory_bytes': peak,
+        'round_trips': counter['round_trips'],
+        'fetch_calls': counter['fetch_calls'],
+    }
+
+def run(backend, sizes, batch_sizes, strategies, max_offset_rows):
+    results = []
+    for size in sizes:
+        seed_table(backend, size)
+        for name in strategies:
+            takes_batch_size = STRATEGIES[name][2]
+            if name == 'lazy_paginate_offset' and size > max_offset_rows:
+                continue  # Quadratic; skipped on large tables unless requested
+            for batch_size in (batch_sizes if takes_batch_size else [None]):
+                result = {'size': size, 'strategy': name, 'batch_size': batch_size}
+                result.update(measure(backend, name, batch_size))
+                results.append(result)
+                print(f"{size:>10} {name:<32} {str(batch_size):>6} "
+                      f"{result['rows_per_sec'] or 0:>12.0f} rows/s "
+                      f"ttfr {result['time_to_first_row'] or 0:.4f}s "
+                      f"peak {result['peak_memory_bytes'] / 1024:.0f} KiB "
+                      f"{result['round_trips']} round trips {result['fetch_calls']} fetches", file=sys.stderr)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the user_data streaming strategies.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000],
+                        help="table sizes to seed, e.g. 10000 1000000 10000000")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--backend', choices=('sqlite', 'mysql'), default='sqlite')
+    parser.add_argument('--database', help="SQLite file to use (default: a temporary file)")
+    parser.add_argument('--max-offset-rows', type=int, default=1000000,
+                        help="skip LIMIT/OFFSET pagination above this table size")
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    if args.backend == 'mysql':
+        backend = MySQLBackend()
+    else:
+        path = args.database
+        if path is None:
+            temp_dir = tempfile.TemporaryDirectory()
+            path = os.path.join(temp_dir.name, "user_data.db")
+        backend = Backend(path)
+
+    try:
+        results = run(backend, args.sizes, args.batch_sizes, args.strategies, args.max_offset_rows)
+    finally:
+        if temp_dir:
+            temp_dir.cleanup()
+
+    report = {
+        'backend': args.backend,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': SEED,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
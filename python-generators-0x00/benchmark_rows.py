@@ -0,0 +1,85 @@
+"""Benchmark the row formats from records.py against dict rows.
+
+Synthetic rows shaped like the driver's output (str user_id/name/email and
+Decimal age) are converted into each format and held in memory, the way a
+batch consumer would. Each format runs in its own child process so peak RSS
+is measured independently. Reports rows/sec, traced peak allocation and
+peak RSS growth per format.
+
+    python benchmark_rows.py --rows 1000000
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import time
+import tracemalloc
+import uuid
+from decimal import Decimal
+from records import USER_COLUMNS, ROW_FORMATS, convert_batch
+
+def make_rows(count):
+    """Build count driver-style (user_id, name, email, age) tuples."""
+    return [
+        (str(uuid.uuid4()), f"User {i % 5000}", f"user{i}@example.com", Decimal(f"{18 + i % 80}.00"))
+        for i in range(count)
+    ]
+
+def build(rows, row_format, batch_size):
+    """Convert rows batch by batch into row_format, keeping every batch alive."""
+    batches = []
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        if row_format == 'dict':
+            batches.append([dict(zip(USER_COLUMNS, row)) for row in chunk])
+        else:
+            batches.append(convert_batch(chunk, row_format))
+    return batches
+
+def _max_rss_kib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def run_format(task):
+    """Child process entry point: time and measure one row format."""
+    row_format, count, batch_size = task
+    rows = make_rows(count)
+    baseline_rss = _max_rss_kib()
+    tracemalloc.start()
+    start = time.perf_counter()
+    batches = build(rows, row_format, batch_size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del batches
+    return {
+        'format': row_format,
+        'rows': count,
+        'seconds': elapsed,
+        'rows_per_sec': count / elapsed if elapsed > 0 else 0.0,
+        'peak_traced_bytes': peak,
+        'peak_rss_growth_kib': _max_rss_kib() - baseline_rss,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare user_data row formats.")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for row_format in ROW_FORMATS:
+        # A fresh process per format keeps the RSS peaks independent
+        with multiprocessing.Pool(processes=1) as pool:
+            results.append(pool.apply(run_format, ((row_format, args.rows, args.batch_size),)))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'format':<8}{'rows/sec':>14}{'traced peak MiB':>18}{'RSS growth MiB':>17}")
+    for result in results:
+        print(f"{result['format']:<8}{result['rows_per_sec']:>14.0f}"
+              f"{result['peak_traced_bytes'] / 2**20:>18.1f}{result['peak_rss_growth_kib'] / 1024:>17.1f}")
+
+if __name__ == "__main__":
+    main()
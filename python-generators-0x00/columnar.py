@@ -0,0 +1,243 @@
+"""Columnar export of user_data into compact, memory-mappable chunk files.
+
+export_user_data() drains the stream_users_in_batches generator and writes
+every batch as a row group of typed columns:
+
+* user_id - fixed-width 16-byte UUIDs
+* age     - little-endian float64
+* name    - uint32 indices into a file-level dictionary of distinct names
+* email   - uint32 offsets followed by the UTF-8 data (Arrow-style strings)
+
+Every column chunk is 8-byte aligned. A JSON footer holds the schema, the
+name dictionary and the row-group index (row counts and byte ranges), so a
+reader can jump to any column of any row group. ColumnarFile memory-maps the
+file and hands out zero-copy memoryviews (or NumPy arrays when available)
+over the column data.
+
+Layout: MAGIC | row groups... | footer JSON | footer length (uint64) | MAGIC
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; plain memoryviews are returned instead
+    np = None
+
+MAGIC = b"UDCOL1\0\0"
+VERSION = 1
+SCHEMA = {'user_id': 'uuid16', 'name': 'dict<utf8>', 'email': 'utf8', 'age': 'float64'}
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+def _to_little_endian(values):
+    """Return the raw little-endian bytes of an array.array."""
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+class ColumnarWriter:
+    """Write batches of user_data row dicts as row groups of a columnar file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.names = []
+        self.name_index = {}
+        self.row_groups = []
+        self.rows = 0
+
+    def _write_aligned(self, data):
+        """Write data 8-byte aligned and return its [offset, length]."""
+        padding = -self.file.tell() % 8
+        if padding:
+            self.file.write(b"\0" * padding)
+        offset = self.file.tell()
+        self.file.write(data)
+        return [offset, len(data)]
+
+    def write_batch(self, batch):
+        """Append one batch of rows as a new row group."""
+        if not batch:
+            return
+        user_ids = bytearray()
+        ages = array('d')
+        names = array('I')
+        email_offsets = array('I', [0])
+        email_data = bytearray()
+        for row in batch:
+            user_ids += uuid.UUID(str(row['user_id'])).bytes
+            ages.append(float(row['age']))
+            index = self.name_index.get(row['name'])
+            if index is None:
+                index = self.name_index[row['name']] = len(self.names)
+                self.names.append(row['name'])
+            names.append(index)
+            email_data += row['email'].encode('utf-8')
+            email_offsets.append(len(email_data))
+
+        self.row_groups.append({
+            'first_row': self.rows,
+            'rows': len(batch),
+            'columns': {
+                'user_id': self._write_aligned(bytes(user_ids)),
+                'age': self._write_aligned(_to_little_endian(ages)),
+                'name': self._write_aligned(_to_little_endian(names)),
+                'email_offsets': self._write_aligned(_to_little_endian(email_offsets)),
+                'email_data': self._write_aligned(bytes(email_data)),
+            },
+        })
+        self.rows += len(batch)
+
+    def close(self):
+        """Write the footer and close the file."""
+        if self.file.closed:
+            return
+        footer = json.dumps({
+            'version': VERSION,
+            'schema': SCHEMA,
+            'rows': self.rows,
+            'name_dictionary': self.names,
+            'row_groups': self.row_groups,
+        }).encode('utf-8')
+        self._write_aligned(footer)
+        self.file.write(struct.pack('<Q', len(footer)))
+        self.file.write(MAGIC)
+        self.file.close()
+
+    def abort(self):
+        """Close and delete an unfinished file, so a failed export never looks complete."""
+        if not self.file.closed:
+            self.file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def export_batches(batches, path):
+    """Write an iterable of row-dict batches to path; returns the number of rows."""
+    with ColumnarWriter(path) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    return writer.rows
+
+def export_user_data(path, batch_size=10000, prefetch_depth=1):
+    """Export the whole user_data table to path, one row group per batch.
+
+    Database errors propagate from the stream, so a failed export raises
+    and leaves no file behind instead of a valid-looking truncated one.
+    """
+    stream_users_in_batches = __import__('1-batch_processing').stream_users_in_batches
+    return export_batches(stream_users_in_batches(batch_size, prefetch_depth), path)
+
+class ColumnarFile:
+    """Memory-mapped reader with zero-copy access to the columns of each row group."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self.map)
+        size = len(self.map)
+        if size < 2 * len(MAGIC) + 8 or self.map[:len(MAGIC)] != MAGIC or self.map[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a columnar user_data file")
+        (footer_length,) = struct.unpack_from('<Q', self.map, size - len(MAGIC) - 8)
+        footer_end = size - len(MAGIC) - 8
+        footer = json.loads(bytes(self.map[footer_end - footer_length:footer_end]))
+        if footer['version'] != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported columnar file version: {footer['version']}")
+        self.rows = footer['rows']
+        self.names = footer['name_dictionary']
+        self.row_groups = footer['row_groups']
+
+    def __len__(self):
+        return self.rows
+
+    def _raw(self, row_group, column):
+        offset, length = self.row_groups[row_group]['columns'][column]
+        return self.buffer[offset:offset + length]
+
+    def _typed(self, row_group, column, typecode, dtype):
+        raw = self._raw(row_group, column)
+        if not _LITTLE_ENDIAN:
+            values = array(typecode, raw.tobytes())
+            values.byteswap()
+            return values
+        if np is not None:
+            return np.frombuffer(raw, dtype=dtype)
+        return raw.cast(typecode)
+
+    def ages(self, row_group):
+        """float64 ages of a row group (zero-copy on little-endian hosts)."""
+        return self._typed(row_group, 'age', 'd', '<f8')
+
+    def name_codes(self, row_group):
+        """uint32 dictionary codes of the names in a row group; decode with self.names."""
+        return self._typed(row_group, 'name', 'I', '<u4')
+
+    def user_id_bytes(self, row_group):
+        """The packed 16-byte UUIDs of a row group as one memoryview."""
+        return self._raw(row_group, 'user_id')
+
+    def emails(self, row_group):
+        """Decoded email strings of a row group."""
+        offsets = self._typed(row_group, 'email_offsets', 'I', '<u4')
+        data = self._raw(row_group, 'email_data')
+        return [str(data[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(len(offsets) - 1)]
+
+    def iter_rows(self):
+        """Generator to yield every row as a dict, row group by row group."""
+        for row_group, meta in enumerate(self.row_groups):
+            ids = self.user_id_bytes(row_group)
+            ages = self.ages(row_group)
+            codes = self.name_codes(row_group)
+            emails = self.emails(row_group)
+            for i in range(meta['rows']):
+                yield {
+                    'user_id': str(uuid.UUID(bytes=bytes(ids[i * 16:(i + 1) * 16]))),
+                    'name': self.names[codes[i]],
+                    'email': emails[i],
+                    'age': float(ages[i]),
+                }
+
+    def close(self):
+        """Release the memory map and the file.
+
+        Column views handed out by this reader must be dropped first, as an
+        mmap cannot be closed while buffers still point into it.
+        """
+        if self.buffer is not None:
+            self.buffer.release()
+            self.buffer = None
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def main():
+    path = "user_data.udcol"
+    rows = export_user_data(path)
+    print(f"Exported {rows} rows to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Parallel, partitioned scans of user_data across worker processes.
+
+The table is split into user_id ranges using split points sampled from the
+primary key, and every range is scanned by its own generator in a process
+pool, each with its own connection. Partial results are then merged:
+
+* aggregates are reduced associatively (AgeStats.merge from aggregations.py)
+* row streams are merged in user_id order; as the ranges are disjoint and
+  ascending, consuming them in partition order yields a globally ordered
+  stream. Each worker returns a partition's matches as one list, and at
+  most `workers` partitions are in flight ahead of the consumer, so memory
+  is bounded by about workers + 1 partitions rather than the whole table
+
+A partition covers lower < user_id <= upper, with None meaning unbounded.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from mysql.connector import Error
+from aggregations import AgeStats
+from predicates import col, plan
+from seed import connect_to_prodev
+
+def sample_split_points(partitions, sample_size=10000, connection=None):
+    """Return up to partitions - 1 ascending user_ids that split the table into similar ranges."""
+    if partitions <= 1:
+        return []
+    own_connection = connection is None
+    if own_connection:
+        connection = connect_to_prodev()
+        if not connection:
+            return []
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM user_data")
+        (count,) = cursor.fetchone()
+        if not count:
+            return []
+        fraction = min(1.0, sample_size / count)
+        cursor.execute("SELECT user_id FROM user_data WHERE RAND() < %s", (fraction,))
+        sample = sorted(user_id for (user_id,) in cursor.fetchall())
+        cursor.close()
+    except Error as e:
+        print(f"Error sampling split points: {e}")
+        return []
+    finally:
+        if own_connection and connection.is_connected():
+            connection.close()
+
+    points = []
+    for i in range(1, partitions):
+        if not sample:
+            break
+        point = sample[min(len(sample) * i // partitions, len(sample) - 1)]
+        if not points or point > points[-1]:
+            points.append(point)
+    return points
+
+def partition_ranges(split_points):
+    """Turn ascending split points into (lower, upper) partition bounds covering the table."""
+    bounds = [None] + list(split_points) + [None]
+    return list(zip(bounds, bounds[1:]))
+
+def range_clause(lower, upper):
+    """Return (where_clause, params) selecting lower < user_id <= upper."""
+    conditions, params = [], []
+    if lower is not None:
+        conditions.append("user_id > %s")
+        params.append(lower)
+    if upper is not None:
+        conditions.append("user_id <= %s")
+        params.append(upper)
+    return " AND ".join(conditions) or "1 = 1", params
+
+def scan_partition(lower, upper, columns="*", where=None, params=(), batch_size=10000, dictionary=True):
+    """Generator to yield batches of one partition's rows in user_id order; errors are raised, not swallowed."""
+    clause, range_params = range_clause(lower, upper)
+    query = f"SELECT {columns} FROM user_data WHERE {clause}"
+    if where:
+        query += f" AND {where}"
+    query += " ORDER BY user_id"
+
+    connection = connect_to_prodev()
+    if not connection:
+        raise ConnectionError(f"Could not connect to scan partition ({lower}, {upper}]")
+
+    try:
+        cursor = connection.cursor(dictionary=dictionary, buffered=False)
+        cursor.execute(query, tuple(range_params) + tuple(params))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+        cursor.close()
+    except Error as e:
+        # A partial partition would silently skew the merged result
+        print(f"Error scanning partition ({lower}, {upper}]: {e}")
+        raise
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+def age_stats_worker(task):
+    """Worker: compute AgeStats over one partition."""
+    (lower, upper), bins, batch_size = task
+    stats = AgeStats(bins=bins)
+    for rows in scan_partition(lower, upper, columns="age + 0E0", batch_size=batch_size, dictionary=False):
+        stats.update([age for (age,) in rows])
+    return stats
+
+def filter_worker(task):
+    """Worker: return the rows of one partition matching a predicate, in user_id order."""
+    (lower, upper), predicate, batch_size = task
+    where, params, residual = plan(predicate)
+    matches = []
+    for rows in scan_partition(lower, upper, where=where, params=params, batch_size=batch_size):
+        matches.extend(rows if residual is None else [row for row in rows if residual(row)])
+    return matches
+
+def _partitions(workers, partitions_per_worker):
+    return partition_ranges(sample_split_points(workers * partitions_per_worker))
+
+def parallel_age_stats(workers=None, bins=None, partitions_per_worker=2, batch_size=10000):
+    """Compute AgeStats over user_data with one scan per partition across a process pool."""
+    workers = workers or os.cpu_count() or 1
+    tasks = [(bounds, bins, batch_size) for bounds in _partitions(workers, partitions_per_worker)]
+    total = AgeStats(bins=bins)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(age_stats_worker, tasks):
+            total.merge(partial)
+    return total
+
+def parallel_average_age(workers=None):
+    """Average age of users computed by a partitioned parallel scan."""
+    return parallel_age_stats(workers).mean
+
+def parallel_filter(predicate=None, workers=None, partitions_per_worker=4, batch_size=10000):
+    """Generator to yield rows matching predicate (default: age > 25) in user_id order.
+
+    Partitions are filtered in parallel; results are consumed in partition
+    order, so rows come out as soon as every earlier partition is done.
+    Only `workers` partitions are submitted ahead of the one being yielded,
+    so finished partitions cannot pile up behind a slow consumer.
+    The predicate must be picklable (RowFilter needs a module-level function).
+    """
+    if predicate is None:
+        predicate = col('age') > 25
+    workers = workers or os.cpu_count() or 1
+    tasks = iter([(bounds, predicate, batch_size) for bounds in _partitions(workers, partitions_per_worker)])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(filter_worker, task) for task in islice(tasks, workers))
+        while pending:
+            rows = pending.popleft().result()
+            for task in islice(tasks, 1):
+                pending.append(pool.submit(filter_worker, task))
+            yield from rows
+
+def main():
+    stats = parallel_age_stats()
+    print(f"Average age of users: {stats.mean:.2f} over {stats.count} rows")
+    print(f"Users over age 25: {sum(1 for _ in parallel_filter())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""A small predicate API for filtering user_data rows.
+
+Predicates are built from columns with comparison operators and combined
+with & (AND) and | (OR). Wherever possible they are compiled to a
+parameterized SQL WHERE clause so the database does the filtering; anything
+that cannot be expressed in SQL is evaluated on the rows client-side.
+
+    >>> predicate = (col('age') > 25) & (col('name') != 'Alice')
+    >>> predicate.to_sql()
+    ('(`age` > %s AND `name` <> %s)', [25, 'Alice'])
+"""
+import operator
+
+# Columns of user_data that may be referenced in a pushed-down WHERE clause
+COLUMNS = ('user_id', 'name', 'email', 'age')
+
+def _flatten(kind, predicate):
+    """Return the parts of predicate if it is already a kind (And/Or), else (predicate,)."""
+    return predicate.parts if isinstance(predicate, kind) else (predicate,)
+
+class Predicate:
+    """Base class for row predicates."""
+
+    def __and__(self, other):
+        return And(*_flatten(And, self), *_flatten(And, other))
+
+    def __or__(self, other):
+        return Or(*_flatten(Or, self), *_flatten(Or, other))
+
+    def to_sql(self):
+        """Return (clause, params) for a WHERE clause, or None if not expressible in SQL."""
+        return None
+
+    def __call__(self, row):
+        """Evaluate the predicate against a row dict."""
+        raise NotImplementedError
+
+class Comparison(Predicate):
+    """A comparison between a column and a constant value."""
+
+    OPERATORS = {
+        '=': operator.eq,
+        '<>': operator.ne,
+        '<': operator.lt,
+        '<=': operator.le,
+        '>': operator.gt,
+        '>=': operator.ge,
+    }
+
+    def __init__(self, column, op, value):
+        if op not in self.OPERATORS:
+            raise ValueError(f"Unsupported operator: {op}")
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def to_sql(self):
+        if self.column not in COLUMNS:
+            return None
+        return f"`{self.column}` {self.op} %s", [self.value]
+
+    def __call__(self, row):
+        return self.OPERATORS[self.op](row[self.column], self.value)
+
+    def __repr__(self):
+        return f"Comparison({self.column!r}, {self.op!r}, {self.value!r})"
+
+class _Compound(Predicate):
+    """Shared logic for AND/OR over several predicates."""
+
+    keyword = None
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def to_sql(self):
+        compiled = [part.to_sql() for part in self.parts]
+        if any(sql is None for sql in compiled):
+            return None
+        clause = f" {self.keyword} ".join(sql for sql, _ in compiled)
+        params = [param for _, part_params in compiled for param in part_params]
+        return f"({clause})", params
+
+    def __repr__(self):
+        return f"{type(self).__name__}{self.parts!r}"
+
+class And(_Compound):
+    """True when every part is true."""
+
+    keyword = 'AND'
+
+    def __call__(self, row):
+        return all(part(row) for part in self.parts)
+
+class Or(_Compound):
+    """True when any part is true."""
+
+    keyword = 'OR'
+
+    def __call__(self, row):
+        return any(part(row) for part in self.parts)
+
+class RowFilter(Predicate):
+    """An arbitrary Python callable; always evaluated client-side."""
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, row):
+        return bool(self.func(row))
+
+    def __repr__(self):
+        return f"RowFilter({self.func!r})"
+
+class Column:
+    """A reference to a column; comparing it with a value builds a Comparison."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, value):
+        return Comparison(self.name, '=', value)
+
+    def __ne__(self, value):
+        return Comparison(self.name, '<>', value)
+
+    def __lt__(self, value):
+        return Comparison(self.name, '<', value)
+
+    def __le__(self, value):
+        return Comparison(self.name, '<=', value)
+
+    def __gt__(self, value):
+        return Comparison(self.name, '>', value)
+
+    def __ge__(self, value):
+        return Comparison(self.name, '>=', value)
+
+    __hash__ = None
+
+def col(name):
+    """Return a Column reference for building predicates."""
+    return Column(name)
+
+def plan(predicate):
+    """Split a predicate into a pushed-down part and a client-side remainder.
+
+    Returns (where_clause, params, residual). where_clause is None when
+    nothing can be pushed down; residual is None when the database filters
+    everything. For a top-level AND, the SQL-expressible parts are pushed
+    down and only the rest is evaluated client-side.
+    """
+    if predicate is None:
+        return None, [], None
+    compiled = predicate.to_sql()
+    if compiled is not None:
+        return compiled[0], compiled[1], None
+    if isinstance(predicate, And):
+        pushed = [part for part in predicate.parts if part.to_sql() is not None]
+        residual = [part for part in predicate.parts if part.to_sql() is None]
+        if pushed:
+            where, params = And(*pushed).to_sql()
+            return where, params, residual[0] if len(residual) == 1 else And(*residual)
+    return None, [], predicate
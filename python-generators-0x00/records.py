@@ -0,0 +1,115 @@
+"""Compact row representations for streamed user_data rows.
+
+The streamers yield dict rows by default (cursor(dictionary=True)), which
+costs one dict per row with repeated key strings and Decimal ages. The
+row formats below trade that for far less memory per row:
+
+* 'dict'  - the driver's dict rows, unchanged
+* 'slots' - UserRecord objects with __slots__ and a float age
+* 'tuple' - UserTuple named tuples with a float age
+* 'batch' - a UserBatch per fetched batch: struct-of-arrays with float64
+            ages and packed 16-byte UUIDs (batch streamers only)
+
+Non-dict formats expect plain tuple rows in USER_COLUMNS order, as returned
+by a regular cursor executing SELECT_USERS.
+"""
+import uuid
+from array import array
+from collections import namedtuple
+
+USER_COLUMNS = ('user_id', 'name', 'email', 'age')
+SELECT_USERS = "SELECT user_id, name, email, age FROM user_data"
+ROW_FORMATS = ('dict', 'slots', 'tuple', 'batch')
+
+UserTuple = namedtuple('UserTuple', USER_COLUMNS)
+
+class UserRecord:
+    """A user_data row without a per-instance __dict__."""
+
+    __slots__ = USER_COLUMNS
+
+    def __init__(self, user_id, name, email, age):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    def __getitem__(self, column):
+        """Allow row['age'] style access like the dict rows."""
+        return getattr(self, column)
+
+    def __eq__(self, other):
+        if not isinstance(other, UserRecord):
+            return NotImplemented
+        return all(getattr(self, column) == getattr(other, column) for column in USER_COLUMNS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"UserRecord(user_id={self.user_id!r}, name={self.name!r}, "
+                f"email={self.email!r}, age={self.age!r})")
+
+class UserBatch:
+    """A batch of rows stored column by column (struct-of-arrays)."""
+
+    __slots__ = ('user_ids', 'names', 'emails', 'ages')
+
+    def __init__(self):
+        self.user_ids = bytearray()  # 16 bytes per row
+        self.names = []
+        self.emails = []
+        self.ages = array('d')
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a batch from (user_id, name, email, age) tuples."""
+        batch = cls()
+        for user_id, name, email, age in rows:
+            # Same bytes as uuid.UUID(user_id).bytes, without building a UUID object
+            packed = bytes.fromhex(user_id.replace('-', ''))
+            if len(packed) != 16:
+                raise ValueError(f"Invalid user_id: {user_id!r}")
+            batch.user_ids += packed
+            batch.names.append(name)
+            batch.emails.append(email)
+            batch.ages.append(float(age))
+        return batch
+
+    def __len__(self):
+        return len(self.ages)
+
+    def user_id(self, index):
+        """Return the user_id of row index as a string."""
+        return str(uuid.UUID(bytes=bytes(self.user_ids[index * 16:(index + 1) * 16])))
+
+    def __getitem__(self, index):
+        """Materialize row index as a UserTuple."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("UserBatch index out of range")
+        return UserTuple(self.user_id(index), self.names[index], self.emails[index], self.ages[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+def convert_row(row, row_format):
+    """Convert one (user_id, name, email, age) tuple to the 'slots' or 'tuple' format."""
+    user_id, name, email, age = row
+    if row_format == 'slots':
+        return UserRecord(user_id, name, email, float(age))
+    if row_format == 'tuple':
+        return UserTuple(user_id, name, email, float(age))
+    raise ValueError(f"Unsupported per-row format: {row_format}")
+
+def convert_batch(rows, row_format):
+    """Convert a list of tuple rows to row_format ('slots', 'tuple' or 'batch')."""
+    if row_format == 'batch':
+        return UserBatch.from_rows(rows)
+    return [convert_row(row, row_format) for row in rows]
+
+def check_row_format(row_format, allowed=ROW_FORMATS):
+    """Raise ValueError for an unknown row_format."""
+    if row_format not in allowed:
+        raise ValueError(f"row_format must be one of {', '.join(allowed)}, not {row_format!r}")
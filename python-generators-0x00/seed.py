@@ -1,7 +1,13 @@
 
 import mysql.connector
+import argparse
 import csv
+import hashlib
+import os
+import sqlite3
+import time
 import uuid
+from multiprocessing import Pool
 from mysql.connector import Error
 
 def connect_db():
@@ -65,43 +71,352 @@ def create_table(connection):
     except Error as e:
         print(f"Error creating table: {e}")
 
-def insert_data(connection, data):
-    """Insert data into the user_data table if it does not exist."""
+def chunked(rows, chunk_size):
+    """Generator to group an iterable of rows into lists of chunk_size rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def insert_data(connection, data, chunk_size=1000, progress=None):
+    """Bulk insert data into the user_data table, skipping existing user_ids.
+
+    Rows are written chunk_size at a time with a single multi-row
+    INSERT IGNORE and one commit per chunk, so duplicates are resolved by
+    the primary key on the server instead of a SELECT per row. data may be
+    any iterable (including a generator); only one chunk is held in memory.
+    If given, progress(rows_done, rows_inserted, elapsed_seconds) is called
+    after every committed chunk. Rows without a user_id get one derived
+    from the email, so re-running the seed skips rows already loaded.
+    """
+    insert_query = """
+    INSERT IGNORE INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    """
+    total = 0
+    inserted = 0
+    start = time.perf_counter()
     try:
         cursor = connection.cursor()
-        insert_query = """
-        INSERT INTO user_data (user_id, name, email, age)
-        VALUES (%s, %s, %s, %s)
-        """
-        # Check for existing user_id to avoid duplicates
-        check_query = "SELECT user_id FROM user_data WHERE user_id = %s"
-        
-        for row in data:
-            user_id = row['user_id'] if row['user_id'] else str(uuid.uuid4())
-            cursor.execute(check_query, (user_id,))
-            if cursor.fetchone() is None:
-                cursor.execute(insert_query, (user_id, row['name'], row['email'], row['age']))
-                print(f"Inserted data for {row['name']}")
-            else:
-                print(f"Data for user_id {user_id} already exists, skipping")
-        
-        connection.commit()
+        for chunk in chunked(data, chunk_size):
+            values = [
+                (row.get('user_id') or stable_user_id(row), row['name'], row['email'], row['age'])
+                for row in chunk
+            ]
+            # executemany rewrites INSERT ... VALUES into one multi-row statement
+            cursor.executemany(insert_query, values)
+            connection.commit()
+            total += len(values)
+            inserted += max(cursor.rowcount, 0)
+            if progress:
+                progress(total, inserted, time.perf_counter() - start)
         cursor.close()
     except Error as e:
         print(f"Error inserting data: {e}")
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Inserted {inserted} of {total} rows ({total - inserted} already existed) "
+          f"in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return inserted
 
-def stream_rows(connection):
-    """Generator to stream rows from user_data table one by one."""
+def stream_rows(connection, prefetch_size=None):
+    """Generator to stream rows from user_data table one by one.
+
+    With prefetch_size set, an unbuffered (server-side) cursor is used and
+    rows are fetched prefetch_size at a time. The stream must then be
+    exhausted before the connection is reused, because unread rows stay
+    pending on it.
+    """
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
-        for row in cursor:
-            yield row
+        if prefetch_size:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute("SELECT * FROM user_data")
+            while True:
+                rows = cursor.fetchmany(prefetch_size)
+                if not rows:
+                    break
+                yield from rows
+        else:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT * FROM user_data")
+            for row in cursor:
+                yield row
         cursor.close()
     except Error as e:
         print(f"Error streaming rows: {e}")
 
-def main():
+def read_csv_rows(csv_file):
+    """Generator to read rows from a CSV file one by one as dicts."""
+    with open(csv_file, mode='r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            yield row
+
+def stable_user_id(row):
+    """Derive a deterministic user_id from the email, for CSVs without a user_id column."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"mailto:{row['email'].strip().lower()}"))
+
+def normalize_rows(rows, make_user_id=stable_user_id):
+    """Generator to coerce age to float and fill in missing user_ids.
+
+    Missing user_ids come from make_user_id(row), by default derived from
+    the email, so every loading mode maps a row to the same key.
+    """
+    for row in rows:
+        user_id = row.get('user_id') or make_user_id(row)
+        yield {
+            'user_id': user_id,
+            'name': row['name'],
+            'email': row['email'],
+            'age': float(row['age']),
+        }
+
+def print_progress(rows_done, rows_inserted, elapsed):
+    """Default progress callback for load_csv."""
+    rate = rows_done / elapsed if elapsed > 0 else 0.0
+    print(f"... {rows_done} rows processed, {rows_inserted} inserted ({rate:.0f} rows/sec)")
+
+def load_csv(connection, csv_file, chunk_size=1000, progress=print_progress):
+    """Stream csv_file into user_data: CSV reader -> normalizer -> chunker -> bulk writer.
+
+    Peak memory is bounded by chunk_size regardless of the file size.
+    """
+    rows = normalize_rows(read_csv_rows(csv_file))
+    return insert_data(connection, rows, chunk_size=chunk_size, progress=progress)
+
+def split_csv_ranges(csv_file, workers):
+    """Split the data section of csv_file into byte ranges aligned on line boundaries.
+
+    Returns a list of (start, end) offsets, at most one per worker. Every
+    range starts at the beginning of a line, so each row (which must not
+    contain embedded newlines) belongs to exactly one range.
+    """
+    with open(csv_file, mode='rb') as file:
+        file.readline()  # Skip the header
+        data_start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        step = max((size - data_start) // max(workers, 1), 1)
+        bounds = [data_start]
+        for i in range(1, workers):
+            file.seek(data_start + i * step)
+            file.readline()  # Advance to the start of the next full line
+            position = file.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def read_csv_range(csv_file, start, end):
+    """Generator to read the CSV rows whose lines start within [start, end)."""
+    with open(csv_file, mode='rb') as file:
+        fieldnames = next(csv.reader([file.readline().decode('utf-8')]))
+        file.seek(start)
+
+        def lines():
+            while file.tell() < end:
+                line = file.readline()
+                if not line:
+                    break
+                yield line.decode('utf-8')
+
+        for row in csv.DictReader(lines(), fieldnames=fieldnames):
+            yield row
+
+def seed_range(task):
+    """Worker entry point: load one byte range of the CSV over its own connection."""
+    worker_id, csv_file, start, end, chunk_size = task
+    stats = {'worker': worker_id, 'rows': 0, 'inserted': 0, 'seconds': 0.0}
+    connection = connect_to_prodev()
+    if not connection:
+        return stats
+
+    def record(rows_done, rows_inserted, elapsed):
+        stats.update(rows=rows_done, inserted=rows_inserted, seconds=elapsed)
+
+    try:
+        rows = normalize_rows(read_csv_range(csv_file, start, end))
+        insert_data(connection, rows, chunk_size=chunk_size, progress=record)
+    finally:
+        connection.close()
+    return stats
+
+def load_csv_parallel(csv_file, workers, chunk_size=1000):
+    """Load csv_file with one process and one connection per byte range.
+
+    Duplicates are still skipped by INSERT IGNORE on the primary key.
+    Prints per-worker and total throughput and returns the per-worker stats.
+    """
+    ranges = split_csv_ranges(csv_file, workers)
+    tasks = [(i, csv_file, start, end, chunk_size) for i, (start, end) in enumerate(ranges)]
+    start = time.perf_counter()
+    with Pool(processes=len(tasks) or 1) as pool:
+        results = pool.map(seed_range, tasks)
+    elapsed = time.perf_counter() - start
+
+    for stats in results:
+        rate = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+        print(f"Worker {stats['worker']}: {stats['rows']} rows, {stats['inserted']} inserted "
+              f"in {stats['seconds']:.2f}s ({rate:.0f} rows/sec)")
+    total_rows = sum(stats['rows'] for stats in results)
+    total_inserted = sum(stats['inserted'] for stats in results)
+    rate = total_rows / elapsed if elapsed > 0 else 0.0
+    print(f"Total: {total_rows} rows, {total_inserted} inserted with {len(tasks)} workers "
+          f"in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return results
+
+def file_fingerprint(path):
+    """Return (size, mtime_ns, sha256 hex digest) of a file."""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, mode='rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+def row_hash(row):
+    """Stable short hash of a normalized row's content."""
+    content = f"{row['user_id']}\x1f{row['name']}\x1f{row['email']}\x1f{row['age']!r}"
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+class SeedManifest:
+    """SQLite-backed record of what a previous incremental seed wrote.
+
+    Stores the CSV fingerprint, one hash per chunk of chunk_size rows and
+    one hash per user_id, so later runs can skip unchanged files, unchanged
+    chunks and unchanged rows.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS chunks (idx INTEGER PRIMARY KEY, hash TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS rows (user_id TEXT PRIMARY KEY, hash TEXT NOT NULL);
+        """)
+
+    def get(self, key):
+        found = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return found[0] if found else None
+
+    def set(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def chunk_hash(self, index):
+        found = self.db.execute("SELECT hash FROM chunks WHERE idx = ?", (index,)).fetchone()
+        return found[0] if found else None
+
+    def row_hashes(self, user_ids):
+        """Return {user_id: hash} for the known user_ids among user_ids."""
+        known = {}
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), 500):
+            batch = user_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(batch))
+            query = f"SELECT user_id, hash FROM rows WHERE user_id IN ({placeholders})"
+            known.update(self.db.execute(query, batch).fetchall())
+        return known
+
+    def record_chunk(self, index, chunk_hash, rows):
+        """Remember a written chunk and the hashes of its rows."""
+        self.db.executemany("INSERT OR REPLACE INTO rows (user_id, hash) VALUES (?, ?)", rows)
+        self.db.execute("INSERT OR REPLACE INTO chunks (idx, hash) VALUES (?, ?)", (index, chunk_hash))
+        self.db.commit()
+
+    def reset_chunks(self):
+        self.db.execute("DELETE FROM chunks")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+def load_csv_incremental(connection, csv_file, chunk_size=1000, manifest_path=None):
+    """Idempotently refresh user_data from csv_file, writing only what changed.
+
+    * unchanged file (same fingerprint as the last run): nothing is read
+    * unchanged chunk (same content hash at the same position): skipped
+    * otherwise only new or changed rows are upserted
+
+    Rows without a user_id get one derived from their email, so re-runs map
+    each row onto the same record. Rows removed from the CSV are left in the
+    table. The manifest is updated chunk by chunk after each commit, so an
+    interrupted run resumes safely. Returns the number of upserted rows.
+    """
+    manifest = SeedManifest(manifest_path or f"{csv_file}.manifest.db")
+    upsert_query = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE name = VALUES(name), email = VALUES(email), age = VALUES(age)
+    """
+    start = time.perf_counter()
+    total = skipped_chunks = upserted = 0
+    try:
+        size, mtime_ns, sha256 = file_fingerprint(csv_file)
+        if manifest.get('sha256') == sha256 and manifest.get('chunk_size') == str(chunk_size):
+            print(f"{csv_file} is unchanged since the last seed, nothing to do")
+            return 0
+        if manifest.get('chunk_size') != str(chunk_size):
+            manifest.reset_chunks()
+
+        cursor = connection.cursor()
+        rows = normalize_rows(read_csv_rows(csv_file))
+        for index, chunk in enumerate(chunked(rows, chunk_size)):
+            total += len(chunk)
+            hashes = [(row['user_id'], row_hash(row)) for row in chunk]
+            chunk_digest = hashlib.blake2b(
+                "".join(digest for _, digest in hashes).encode('ascii'), digest_size=16
+            ).hexdigest()
+            if manifest.chunk_hash(index) == chunk_digest:
+                skipped_chunks += 1
+                continue
+
+            known = manifest.row_hashes(user_id for user_id, _ in hashes)
+            changed = [
+                (row['user_id'], row['name'], row['email'], row['age'])
+                for row, (user_id, digest) in zip(chunk, hashes)
+                if known.get(user_id) != digest
+            ]
+            if changed:
+                cursor.executemany(upsert_query, changed)
+                connection.commit()
+                upserted += len(changed)
+            manifest.record_chunk(index, chunk_digest, hashes)
+        cursor.close()
+
+        manifest.set('size', size)
+        manifest.set('mtime_ns', mtime_ns)
+        manifest.set('sha256', sha256)
+        manifest.set('chunk_size', chunk_size)
+        manifest.db.commit()
+    except Error as e:
+        print(f"Error upserting data: {e}")
+    finally:
+        manifest.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Checked {total} rows in {elapsed:.2f}s: skipped {skipped_chunks} unchanged chunks, "
+          f"upserted {upserted} new or changed rows")
+    return upserted
+
+def parse_args(argv=None):
+    """Parse command line options for seeding."""
+    parser = argparse.ArgumentParser(description="Seed the ALX_prodev user_data table from a CSV file.")
+    parser.add_argument('--csv', default="user_data.csv", help="CSV file to load")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="rows per INSERT/commit")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of worker processes, each loading its own slice of the CSV")
+    parser.add_argument('--incremental', action='store_true',
+                        help="skip unchanged data using a manifest from the previous run and upsert changes")
+    parser.add_argument('--manifest', help="manifest file for --incremental (default: <csv>.manifest.db)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Connect to MySQL server
     connection = connect_db()
     if not connection:
@@ -119,27 +434,24 @@ def main():
     # Create table
     create_table(connection)
     
-    # Read sample CSV data
-    csv_file = "user_data.csv"
-    data = []
+    # Stream the CSV into the table chunk by chunk
+    csv_file = args.csv
     try:
-        with open(csv_file, mode='r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                # Ensure age is a float
-                row['age'] = float(row['age'])
-                data.append(row)
+        if args.incremental:
+            load_csv_incremental(connection, csv_file, chunk_size=args.chunk_size,
+                                 manifest_path=args.manifest)
+        elif args.workers > 1:
+            load_csv_parallel(csv_file, args.workers, chunk_size=args.chunk_size)
+        else:
+            load_csv(connection, csv_file, chunk_size=args.chunk_size)
     except FileNotFoundError:
         print(f"Error: {csv_file} not found")
         connection.close()
         return
     
-    # Insert data
-    insert_data(connection, data)
-    
     # Stream and print rows
     print("\nStreaming rows from user_data table:")
-    for row in stream_rows(connection):
+    for row in stream_rows(connection, prefetch_size=args.chunk_size):
         print(row)
     
     # Close connection
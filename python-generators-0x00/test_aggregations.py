@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Unit tests for the AgeStats accumulator."""
+import math
+import random
+import statistics
+import unittest
+from unittest.mock import patch
+import aggregations
+from aggregations import AgeStats
+
+BINS = [0, 18, 30, 50, 80, 120]
+
+
+def reference_histogram(values, bins):
+    """Counts per bin with numpy.histogram's convention: the last bin is closed."""
+    counts = [0] * (len(bins) - 1)
+    for value in values:
+        for index in range(len(counts)):
+            last = index == len(counts) - 1
+            if bins[index] <= value < bins[index + 1] or (last and value == bins[-1]):
+                counts[index] += 1
+                break
+    return counts
+
+
+class TestAgeStats(unittest.TestCase):
+    """Test cases for AgeStats, with and without NumPy."""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.randint(0, 120) + rng.random() for _ in range(1000)] + [0.0, 18.0, 120.0]
+
+    def check(self, stats, values):
+        self.assertEqual(stats.count, len(values))
+        self.assertAlmostEqual(stats.sum, math.fsum(values), places=6)
+        self.assertAlmostEqual(stats.mean, statistics.fmean(values), places=9)
+        self.assertAlmostEqual(stats.variance, statistics.pvariance(values), places=6)
+        self.assertAlmostEqual(stats.sample_variance, statistics.variance(values), places=6)
+        self.assertEqual((stats.min, stats.max), (min(values), max(values)))
+        self.assertEqual(stats.histogram, reference_histogram(values, BINS))
+
+    def chunked_stats(self):
+        stats = AgeStats(BINS)
+        for start in range(0, len(self.values), 97):
+            stats.update(self.values[start:start + 97])
+        return stats
+
+    def test_chunked_updates(self):
+        """Chunk-by-chunk updates match the statistics of all values."""
+        self.check(self.chunked_stats(), self.values)
+
+    def test_chunked_updates_without_numpy(self):
+        """The pure-Python path gives the same results."""
+        with patch.object(aggregations, 'np', None):
+            self.check(self.chunked_stats(), self.values)
+
+    def test_merge(self):
+        """Merging per-partition stats equals one pass over all values."""
+        parts = [AgeStats(BINS) for _ in range(3)]
+        for index, value in enumerate(self.values):
+            parts[index % 3].update([value])
+        merged = AgeStats(BINS)
+        for part in parts:
+            merged.merge(part)
+        self.check(merged, self.values)
+
+    def test_merge_empty(self):
+        """Merging or updating with nothing leaves the stats unchanged."""
+        stats = AgeStats(BINS)
+        stats.update([])
+        stats.merge(AgeStats(BINS))
+        self.assertEqual(stats.as_dict()['count'], 0)
+        self.assertIsNone(stats.as_dict()['min'])
+        self.assertEqual(stats.histogram, [0] * (len(BINS) - 1))
+
+    def test_values_outside_bins_are_not_counted(self):
+        """Only values within the bin edges land in the histogram."""
+        for np in (aggregations.np, None):
+            with patch.object(aggregations, 'np', np):
+                stats = AgeStats([10, 20])
+                stats.update([5, 10, 15, 20, 25])
+                self.assertEqual(stats.histogram, [3])
+                self.assertEqual(stats.count, 5)
+
+    def test_no_bins(self):
+        """Without bins no histogram is kept."""
+        stats = AgeStats()
+        stats.update([1, 2, 3])
+        self.assertIsNone(stats.histogram)
+        self.assertEqual(stats.as_dict()['mean'], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Unit tests for 1-batch_processing, against an in-memory stand-in connection."""
+import contextlib
+import io
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from mysql.connector import Error
+
+batch_processing = __import__('1-batch_processing')
+
+ROWS = [{'user_id': str(i), 'name': f"User {i}", 'email': f"u{i}@example.com", 'age': 20 + i} for i in range(10)]
+
+
+class FakeConnection:
+    """Serves ROWS through fetchmany; fetch number fail_on raises a database error."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.fetches = 0
+        self.closed = False
+
+    def cursor(self, **options):
+        return self
+
+    def execute(self, query, params=()):
+        self.position = 0
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        if self.fetches == self.fail_on:
+            raise Error("Lost connection to MySQL server during query")
+        rows = ROWS[self.position:self.position + size]
+        self.position += size
+        return rows
+
+    def close(self):
+        self.closed = True
+
+    def is_connected(self):
+        return not self.closed
+
+
+class TestPrefetch(unittest.TestCase):
+    """Test cases for prefetch."""
+
+    def test_yields_everything_in_order(self):
+        """Items come out unchanged and in order."""
+        self.assertEqual(list(batch_processing.prefetch(iter(range(100)), 3)), list(range(100)))
+
+    def test_reads_ahead(self):
+        """The producer runs ahead of a slow consumer, up to depth items."""
+        produced = []
+
+        def source():
+            for i in range(5):
+                produced.append(i)
+                yield i
+
+        stream = batch_processing.prefetch(source(), 2)
+        self.assertEqual(next(stream), 0)
+        time.sleep(0.05)
+        self.assertGreaterEqual(len(produced), 3)
+        stream.close()
+
+    def test_producer_errors_are_raised(self):
+        """An exception in the producer reaches the consumer after the items before it."""
+        def source():
+            yield 1
+            raise ValueError("producer failed")
+
+        stream = batch_processing.prefetch(source(), 2)
+        self.assertEqual(next(stream), 1)
+        with self.assertRaises(ValueError):
+            next(stream)
+
+    def test_close_stops_producer(self):
+        """Closing the consumer closes the source and ends the producer thread."""
+        closed = threading.Event()
+
+        def source():
+            try:
+                while True:
+                    yield 1
+            finally:
+                closed.set()
+
+        stream = batch_processing.prefetch(source(), 1)
+        next(stream)
+        stream.close()
+        self.assertTrue(closed.wait(1))
+
+
+class TestStreamUsersInBatches(unittest.TestCase):
+    """Test cases for stream_users_in_batches error propagation."""
+
+    def stream(self, connection, **options):
+        with patch.object(batch_processing, 'connect_to_prodev', return_value=connection), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return list(batch_processing.stream_users_in_batches(3, **options))
+
+    def test_batches(self):
+        """All rows arrive in batches of batch_size."""
+        connection = FakeConnection()
+        self.assertEqual(self.stream(connection), [ROWS[0:3], ROWS[3:6], ROWS[6:9], ROWS[9:]])
+        self.assertTrue(connection.closed)
+
+    def test_database_error_is_raised(self):
+        """A failed fetch is raised instead of ending the stream early."""
+        for depth in (0, 2):
+            connection = FakeConnection(fail_on=3)
+            with self.assertRaises(Error, msg=f"prefetch_depth={depth}"):
+                self.stream(connection, prefetch_depth=depth)
+            self.assertTrue(connection.closed)
+
+    def test_no_connection(self):
+        """Failing to connect raises ConnectionError instead of yielding nothing."""
+        with self.assertRaises(ConnectionError):
+            self.stream(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
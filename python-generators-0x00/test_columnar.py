@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Unit tests for the columnar writer and reader."""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import uuid
+from unittest.mock import patch
+from mysql.connector import Error
+from columnar import ColumnarFile, ColumnarWriter, export_batches, export_user_data
+
+batch_processing = __import__('1-batch_processing')
+
+
+def make_rows(count, start=0):
+    return [{
+        'user_id': str(uuid.UUID(int=start + i)),
+        'name': f"Name {(start + i) % 5}",
+        'email': f"user{start + i}@exämple.com",
+        'age': 18 + (start + i) % 60 + 0.5,
+    } for i in range(count)]
+
+
+class TestColumnarRoundTrip(unittest.TestCase):
+    """Test cases for writing and reading columnar files."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "users.udcol")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Rows read back equal the rows written, across row groups."""
+        batches = [make_rows(7), make_rows(3, 7), [], make_rows(11, 10)]
+        self.assertEqual(export_batches(batches, self.path), 21)
+        with ColumnarFile(self.path) as columns:
+            self.assertEqual(len(columns), 21)
+            self.assertEqual(len(columns.row_groups), 3)
+            self.assertEqual(list(columns.iter_rows()), [row for batch in batches for row in batch])
+
+    def test_column_access(self):
+        """Columns of a row group are available without materializing rows."""
+        rows = make_rows(10)
+        export_batches([rows], self.path)
+        with ColumnarFile(self.path) as columns:
+            self.assertEqual([float(age) for age in columns.ages(0)], [row['age'] for row in rows])
+            self.assertEqual([columns.names[code] for code in columns.name_codes(0)], [row['name'] for row in rows])
+            self.assertEqual(columns.emails(0), [row['email'] for row in rows])
+            self.assertEqual(len(columns.names), 5)
+            self.assertEqual(bytes(columns.user_id_bytes(0)[:16]), uuid.UUID(rows[0]['user_id']).bytes)
+
+    def test_column_chunks_are_aligned(self):
+        """Every column chunk starts on an 8-byte boundary."""
+        export_batches([make_rows(3), make_rows(5, 3)], self.path)
+        with ColumnarFile(self.path) as columns:
+            for row_group in columns.row_groups:
+                for offset, _ in row_group['columns'].values():
+                    self.assertEqual(offset % 8, 0)
+
+    def test_empty_export(self):
+        """An export without rows is a valid empty file."""
+        export_batches([], self.path)
+        with ColumnarFile(self.path) as columns:
+            self.assertEqual(list(columns.iter_rows()), [])
+
+    def test_not_a_columnar_file(self):
+        """Other files are rejected with ValueError."""
+        with open(self.path, 'wb') as file:
+            file.write(b"name,email,age\n" * 10)
+        with self.assertRaises(ValueError):
+            ColumnarFile(self.path)
+
+    def test_failed_export_leaves_no_file(self):
+        """An error while writing removes the unfinished file."""
+        def batches():
+            yield make_rows(5)
+            raise RuntimeError("source failed")
+
+        with self.assertRaises(RuntimeError):
+            export_batches(batches(), self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_reader_keeps_file_on_error(self):
+        """An error while reading is raised unchanged and the file is kept."""
+        export_batches([make_rows(2)], self.path)
+        with self.assertRaises(KeyError):
+            with ColumnarFile(self.path) as columns:
+                raise KeyError('consumer')
+        self.assertTrue(columns.map.closed)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_writer_context_closes(self):
+        """Leaving the writer's with block writes the footer."""
+        with ColumnarWriter(self.path) as writer:
+            writer.write_batch(make_rows(4))
+        with ColumnarFile(self.path) as columns:
+            self.assertEqual(len(columns), 4)
+
+
+class FailingConnection:
+    """Serves make_rows(100) through fetchmany; the third fetch raises a database error."""
+
+    def __init__(self):
+        self.rows = make_rows(100)
+        self.fetches = 0
+
+    def cursor(self, **options):
+        return self
+
+    def execute(self, query, params=()):
+        pass
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        if self.fetches == 3:
+            raise Error("Lost connection to MySQL server during query")
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+
+class TestExportUserData(unittest.TestCase):
+    """Test cases for export_user_data when the database fails."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "users.udcol")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def export(self, connection, prefetch_depth):
+        with patch.object(batch_processing, 'connect_to_prodev', return_value=connection), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return export_user_data(self.path, batch_size=2, prefetch_depth=prefetch_depth)
+
+    def test_fetch_error_leaves_no_file(self):
+        """A database error mid-export raises and leaves no truncated file."""
+        for depth in (0, 1):
+            with self.assertRaises(Error):
+                self.export(FailingConnection(), depth)
+            self.assertFalse(os.path.exists(self.path), f"prefetch_depth={depth}")
+
+    def test_no_connection_leaves_no_file(self):
+        """Without a connection nothing that looks like an empty table is written."""
+        with self.assertRaises(ConnectionError):
+            self.export(None, 0)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
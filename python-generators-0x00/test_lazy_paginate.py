@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Unit tests for the resume cursors of 2-lazy_paginate."""
+import base64
+import unittest
+
+lazy_paginate = __import__('2-lazy_paginate')
+
+
+class TestResumeCursor(unittest.TestCase):
+    """Test cases for encode_cursor and decode_cursor."""
+
+    def test_round_trip(self):
+        """A cursor decodes to the user_id of the last row of its page."""
+        page = [{'user_id': '00000000-0000-0000-0000-000000000001'},
+                {'user_id': 'ffffffff-0000-0000-0000-000000000002'}]
+        cursor = lazy_paginate.encode_cursor(page)
+        self.assertEqual(lazy_paginate.decode_cursor(cursor), 'ffffffff-0000-0000-0000-000000000002')
+
+    def test_cursor_is_url_safe(self):
+        """Cursors can be passed around in URLs unescaped."""
+        cursor = lazy_paginate.encode_cursor([{'user_id': 'ÿ' * 20}])
+        self.assertRegex(cursor, r"^[A-Za-z0-9_=-]+$")
+
+    def test_empty_cursor_starts_from_the_beginning(self):
+        """No cursor means no last seen user_id."""
+        self.assertIsNone(lazy_paginate.decode_cursor(None))
+        self.assertIsNone(lazy_paginate.decode_cursor(''))
+
+    def test_invalid_cursors_raise_value_error(self):
+        """Garbage, non-JSON and JSON without 'after' are all rejected."""
+        for cursor in ('not a cursor!', base64.urlsafe_b64encode(b'{"x": 1}').decode(),
+                       base64.urlsafe_b64encode(b'[1, 2]').decode(), base64.urlsafe_b64encode(b'{').decode()):
+            with self.assertRaises(ValueError, msg=cursor):
+                lazy_paginate.decode_cursor(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Unit tests for the predicate API."""
+import unittest
+from predicates import And, Comparison, Or, RowFilter, col, plan
+
+ALICE = {'user_id': '1', 'name': 'Alice', 'email': 'alice@example.com', 'age': 30}
+BOB = {'user_id': '2', 'name': 'Bob', 'email': 'bob@example.com', 'age': 20}
+
+
+class TestPredicates(unittest.TestCase):
+    """Test cases for building and evaluating predicates."""
+
+    def test_to_sql(self):
+        """Comparisons compile to parameterized SQL."""
+        predicate = (col('age') > 25) & (col('name') != 'Alice')
+        self.assertEqual(predicate.to_sql(), ('(`age` > %s AND `name` <> %s)', [25, 'Alice']))
+
+    def test_and_or_flatten(self):
+        """Chained & and | build one flat compound."""
+        predicate = (col('age') > 1) & (col('age') < 9) & (col('name') == 'x')
+        self.assertIsInstance(predicate, And)
+        self.assertEqual(len(predicate.parts), 3)
+        self.assertEqual(len(((col('age') > 1) | (col('age') < 9) | (col('name') == 'x')).parts), 3)
+
+    def test_evaluation(self):
+        """Predicates evaluate against row dicts like the SQL would."""
+        predicate = (col('age') >= 30) | (col('name') == 'Bob')
+        self.assertTrue(predicate(ALICE))
+        self.assertTrue(predicate(BOB))
+        self.assertFalse((col('age') < 25)(ALICE))
+
+    def test_unknown_operator(self):
+        """Only SQL comparison operators are accepted."""
+        with self.assertRaises(ValueError):
+            Comparison('age', '~', 1)
+
+    def test_unknown_column_is_not_pushed_down(self):
+        """Columns outside user_data cannot be compiled to SQL."""
+        self.assertIsNone((col('nickname') == 'x').to_sql())
+
+
+class TestPlan(unittest.TestCase):
+    """Test cases for plan."""
+
+    def test_no_predicate(self):
+        """Nothing to filter."""
+        self.assertEqual(plan(None), (None, [], None))
+
+    def test_fully_pushed_down(self):
+        """An SQL-expressible predicate leaves no residual."""
+        self.assertEqual(plan(col('age') > 25), ('`age` > %s', [25], None))
+
+    def test_row_filter_stays_client_side(self):
+        """A Python callable is evaluated entirely on the client."""
+        predicate = RowFilter(lambda row: row['email'].endswith('.com'))
+        self.assertEqual(plan(predicate), (None, [], predicate))
+
+    def test_and_splits_into_pushed_and_residual(self):
+        """For a top-level AND the SQL parts are pushed down and the rest kept."""
+        residual = RowFilter(lambda row: row['name'].startswith('A'))
+        where, params, rest = plan((col('age') > 25) & residual & (col('age') < 40))
+        self.assertEqual((where, params), ('(`age` > %s AND `age` < %s)', [25, 40]))
+        self.assertIs(rest, residual)
+
+    def test_and_with_several_residuals(self):
+        """Several client-side parts are combined into one AND residual."""
+        first = RowFilter(lambda row: True)
+        second = col('nickname') == 'x'
+        where, params, rest = plan(first & (col('age') > 25) & second)
+        self.assertEqual((where, params), ('(`age` > %s)', [25]))
+        self.assertIsInstance(rest, And)
+        self.assertEqual(rest.parts, (first, second))
+
+    def test_or_with_client_side_part_is_not_split(self):
+        """An OR can only be pushed down as a whole."""
+        predicate = (col('age') > 25) | RowFilter(lambda row: True)
+        self.assertEqual(plan(predicate), (None, [], predicate))
+        self.assertIsInstance(predicate, Or)
+
+    def test_pushed_and_residual_agree_with_full_predicate(self):
+        """Filtering with the plan gives the same rows as the original predicate."""
+        predicate = (col('age') > 25) & RowFilter(lambda row: 'a' in row['email'])
+        _, _, rest = plan(predicate)
+        rows = [ALICE, BOB]
+        pushed = [row for row in rows if row['age'] > 25]
+        self.assertEqual([row for row in pushed if rest(row)], [row for row in rows if predicate(row)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Unit tests for the compact row formats."""
+import unittest
+import uuid
+from decimal import Decimal
+from records import UserBatch, UserRecord, UserTuple, check_row_format, convert_batch, convert_row
+
+ROWS = [
+    (str(uuid.UUID(int=1)), 'Alice', 'alice@example.com', Decimal('30')),
+    (str(uuid.UUID(int=2 ** 128 - 1)), 'Bob', 'bob@example.com', Decimal('41.5')),
+]
+
+
+class TestRowFormats(unittest.TestCase):
+    """Test cases for convert_row and convert_batch."""
+
+    def test_slots(self):
+        """'slots' rows are UserRecords with float ages and dict-style access."""
+        record = convert_row(ROWS[1], 'slots')
+        self.assertIsInstance(record, UserRecord)
+        self.assertEqual(record['age'], 41.5)
+        self.assertIsInstance(record.age, float)
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(record, UserRecord(*ROWS[1][:3], 41.5))
+
+    def test_tuple(self):
+        """'tuple' rows are UserTuples with float ages."""
+        self.assertEqual(convert_row(ROWS[0], 'tuple'), UserTuple(*ROWS[0][:3], 30.0))
+
+    def test_unknown_format(self):
+        """Unknown or batch-only formats are rejected per row."""
+        with self.assertRaises(ValueError):
+            convert_row(ROWS[0], 'batch')
+        with self.assertRaises(ValueError):
+            check_row_format('xml')
+        check_row_format('batch')
+
+    def test_convert_batch(self):
+        """Per-row formats convert every row of a batch."""
+        self.assertEqual(convert_batch(ROWS, 'tuple'), [convert_row(row, 'tuple') for row in ROWS])
+
+
+class TestUserBatch(unittest.TestCase):
+    """Test cases for the struct-of-arrays UserBatch."""
+
+    def test_round_trip(self):
+        """Rows come back as UserTuples with the same values."""
+        batch = UserBatch.from_rows(ROWS)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(list(batch), [UserTuple(user_id, name, email, float(age))
+                                       for user_id, name, email, age in ROWS])
+        self.assertEqual(batch[-1].user_id, ROWS[1][0])
+        self.assertEqual(len(batch.user_ids), 32)
+
+    def test_index_error(self):
+        """Indexing past the end raises IndexError."""
+        batch = convert_batch(ROWS, 'batch')
+        with self.assertRaises(IndexError):
+            batch[2]
+        with self.assertRaises(IndexError):
+            batch[-3]
+
+    def test_invalid_user_id(self):
+        """user_ids that are not 16-byte UUIDs are rejected."""
+        with self.assertRaises(ValueError):
+            UserBatch.from_rows([('1234', 'A', 'a@example.com', 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
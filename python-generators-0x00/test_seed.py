@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Unit tests for the CSV helpers and incremental seeding of seed."""
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+from seed import (SeedManifest, load_csv_incremental, read_csv_range, read_csv_rows, split_csv_ranges,
+                  stable_user_id)
+
+
+class TestCsvRanges(unittest.TestCase):
+    """Test cases for split_csv_ranges and read_csv_range."""
+
+    def setUp(self):
+        """Write a CSV with a few hundred rows of varying length."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "users.csv")
+        with open(self.path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['name', 'email', 'age'])
+            for i in range(317):
+                writer.writerow([f"User {'x' * (i % 13)}{i}", f"user{i}@example.com", 20 + i % 50])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ranges_cover_every_row_once(self):
+        """Reading every range in order gives back exactly the rows of the file."""
+        expected = list(read_csv_rows(self.path))
+        for workers in (1, 2, 3, 7, 16):
+            ranges = split_csv_ranges(self.path, workers)
+            self.assertLessEqual(len(ranges), workers)
+            rows = [row for start, end in ranges for row in read_csv_range(self.path, start, end)]
+            self.assertEqual(rows, expected, f"workers={workers}")
+
+    def test_ranges_are_contiguous_and_line_aligned(self):
+        """Each range starts right after the previous one, at the start of a line."""
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        ranges = split_csv_ranges(self.path, 4)
+        self.assertEqual(ranges[0][0], data.index(b"\n") + 1)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1:start], b"\n")
+
+    def test_more_workers_than_rows(self):
+        """A tiny file yields no more ranges than it has rows."""
+        path = os.path.join(self.tmp.name, "small.csv")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("name,email,age\nA,a@example.com,30\nB,b@example.com,40\n")
+        ranges = split_csv_ranges(path, 8)
+        self.assertLessEqual(len(ranges), 2)
+        rows = [row for start, end in ranges for row in read_csv_range(path, start, end)]
+        self.assertEqual([row['name'] for row in rows], ['A', 'B'])
+
+    def test_header_only(self):
+        """A file without data rows has no ranges."""
+        path = os.path.join(self.tmp.name, "empty.csv")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("name,email,age\n")
+        self.assertEqual(split_csv_ranges(path, 4), [])
+
+
+class RecordingConnection:
+    """Collects the rows upserted through executemany instead of talking to MySQL."""
+
+    def __init__(self):
+        self.upserted = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def executemany(self, query, rows):
+        self.upserted.extend(rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class TestIncrementalSeed(unittest.TestCase):
+    """Test cases for SeedManifest and load_csv_incremental."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "users.csv")
+        self.manifest = os.path.join(self.tmp.name, "manifest.db")
+        self.rows = [[f"User {i}", f"user{i}@example.com", str(20 + i)] for i in range(25)]
+        self.write_csv()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_csv(self):
+        with open(self.path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['name', 'email', 'age'])
+            writer.writerows(self.rows)
+
+    def seed(self):
+        """Run an incremental seed and return the rows it upserted."""
+        connection = RecordingConnection()
+        with contextlib.redirect_stdout(io.StringIO()):
+            count = load_csv_incremental(connection, self.path, chunk_size=10, manifest_path=self.manifest)
+        self.assertEqual(count, len(connection.upserted))
+        return connection.upserted
+
+    def test_first_run_upserts_everything(self):
+        """Without a manifest every row is written, with a stable user_id."""
+        upserted = self.seed()
+        self.assertEqual(len(upserted), 25)
+        self.assertEqual(upserted[0][0], stable_user_id({'email': 'user0@example.com'}))
+
+    def test_unchanged_file_is_skipped(self):
+        """A second run over the same file writes nothing."""
+        self.seed()
+        self.assertEqual(self.seed(), [])
+
+    def test_only_changed_rows_are_upserted(self):
+        """Editing one row rewrites just that row."""
+        self.seed()
+        self.rows[13][2] = '99'
+        self.write_csv()
+        upserted = self.seed()
+        self.assertEqual([(name, age) for _, name, _, age in upserted], [('User 13', 99.0)])
+
+    def test_appended_rows_are_upserted(self):
+        """New rows at the end are written; unchanged chunks are skipped."""
+        self.seed()
+        self.rows.append(["New", "new@example.com", "50"])
+        self.write_csv()
+        self.assertEqual([row[1] for row in self.seed()], ['New'])
+
+    def test_manifest_records_chunks_and_rows(self):
+        """The manifest keeps the file digest, one hash per chunk and one per row."""
+        self.seed()
+        manifest = SeedManifest(self.manifest)
+        try:
+            self.assertEqual(manifest.get('chunk_size'), '10')
+            self.assertIsNotNone(manifest.get('sha256'))
+            self.assertIsNotNone(manifest.chunk_hash(2))
+            self.assertIsNone(manifest.chunk_hash(3))
+            user_id = stable_user_id({'email': 'user3@example.com'})
+            self.assertEqual(list(manifest.row_hashes([user_id, 'unknown'])), [user_id])
+        finally:
+            manifest.close()
+
+
+if __name__ == "__main__":
+    unittest.main()